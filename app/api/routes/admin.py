@@ -0,0 +1,39 @@
+from datetime import date
+
+from fastapi import APIRouter, Depends, Query
+
+from app.core.errors import AppError
+from app.core.jwks import jwks_provider_singleton
+from app.core.security import require_admin, verified_tokens_stats
+from app.services.fx_service import fx_service_singleton
+from app.services.users_service import identity_cache
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+FX_PREFETCH_MAX_DAYS = 366 * 5
+
+
+@router.get("/stats")
+def stats():
+    return {
+        "jwks": jwks_provider_singleton.stats(),
+        "verifiedTokens": verified_tokens_stats(),
+        "identityCache": identity_cache.stats(),
+        "fx": fx_service_singleton.stats(),
+    }
+
+
+@router.post("/fx/prefetch")
+async def fx_prefetch(
+    from_: str = Query(..., alias="from", pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    to: str = Query(..., pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    concurrency: int = Query(4, ge=1, le=16),
+):
+    start = date.fromisoformat(from_)
+    end = date.fromisoformat(to)
+    if end < start:
+        raise AppError("VALIDATION_ERROR", "`to` must be >= `from`", status_code=400)
+    if (end - start).days >= FX_PREFETCH_MAX_DAYS:
+        raise AppError("VALIDATION_ERROR", f"Range is limited to {FX_PREFETCH_MAX_DAYS} days", status_code=400)
+
+    return await fx_service_singleton.prefetch_range(start, end, concurrency=concurrency)
@@ -1,9 +1,22 @@
+import json
+from collections import defaultdict
 from datetime import date
+from typing import Dict, Iterator, Literal, Optional, Tuple
+
 from fastapi import APIRouter, Query
+
+from app.core.errors import AppError
+from fastapi.responses import StreamingResponse
+
+from app.core.fx import cents_to_decimal, convert_cents, money_str_to_cents, rate_to_scaled
+from app.schemas.fx import FxConvertItem, FxConvertRequest
 from app.services.fx_service import fx_service_singleton
 
 router = APIRouter(prefix="/fx", tags=["fx"])
 
+FX_TIMESERIES_MAX_DAYS = 366 * 2
+FX_TIMESERIES_MAX_SYMBOLS = 20
+
 
 def parse_ymd(s: str) -> date:
     y, m, d = [int(x) for x in s.split("-")]
@@ -17,7 +30,7 @@ async def get_rate(
         asOf: str = Query(..., pattern=r"^\d{4}-\d{2}-\d{2}$"),
 ):
     fx = await fx_service_singleton.get_rate(base=base, quote=quote, as_of=parse_ymd(asOf))
-    return {"base": fx.base, "quote": fx.quote, "asOf": fx.as_of.isoformat(), "rate": fx.rate}
+    return {"base": fx.base, "quote": fx.quote, "asOf": fx.as_of.isoformat(), "rate": fx.rate, "stale": fx.stale}
 
 
 @router.get("/latest")
@@ -26,7 +39,7 @@ async def latest(
         quote: str = Query(..., min_length=3, max_length=8),
 ):
     fx = await fx_service_singleton.get_rate(base=base, quote=quote, as_of=date.today())
-    return {"base": fx.base, "quote": fx.quote, "asOf": fx.as_of.isoformat(), "rate": fx.rate}
+    return {"base": fx.base, "quote": fx.quote, "asOf": fx.as_of.isoformat(), "rate": fx.rate, "stale": fx.stale}
 
 
 @router.get("/quotes")
@@ -45,3 +58,124 @@ async def fx_quotes(
         "asOf": as_of_date.isoformat(),
         "rates": rates,  # { "USD": 0.0xx, "EUR": 0.0yy, ... }
     }
+
+
+@router.get("/timeseries")
+async def fx_timeseries(
+        base: str = Query(..., min_length=3, max_length=8),
+        symbols: str = Query(..., description="Comma-separated list, e.g. USD,EUR,CZK"),
+        from_: str = Query(..., alias="from", pattern=r"^\d{4}-\d{2}-\d{2}$"),
+        to: str = Query(..., pattern=r"^\d{4}-\d{2}-\d{2}$"),
+):
+    start = date.fromisoformat(from_)
+    end = date.fromisoformat(to)
+    if end < start:
+        raise AppError("VALIDATION_ERROR", "`to` must be >= `from`", status_code=400)
+    if (end - start).days >= FX_TIMESERIES_MAX_DAYS:
+        raise AppError("VALIDATION_ERROR", f"Range is limited to {FX_TIMESERIES_MAX_DAYS} days", status_code=400)
+
+    quotes = list(dict.fromkeys(x.strip().upper() for x in symbols.split(",") if x.strip()))
+    if not quotes:
+        raise AppError("VALIDATION_ERROR", "`symbols` must not be empty", status_code=400)
+    if len(quotes) > FX_TIMESERIES_MAX_SYMBOLS:
+        raise AppError("VALIDATION_ERROR", f"At most {FX_TIMESERIES_MAX_SYMBOLS} symbols", status_code=400)
+
+    days, columns = await fx_service_singleton.get_timeseries(base, quotes, start, end)
+
+    return {
+        "base": base.upper(),
+        "from": start.isoformat(),
+        "to": days[-1].isoformat() if days else end.isoformat(),
+        "dates": [d.isoformat() for d in days],
+        "rates": columns,  # { "USD": [0.0xx, ...], ... } aligned with `dates`, null where unknown
+    }
+
+
+# rows serialized per streamed chunk
+FX_CONVERT_CHUNK = 500
+
+
+def _convert_rows(
+        items: list[FxConvertItem],
+        by_date: Dict[date, Tuple[Optional[date], Dict[str, float]]],
+) -> Iterator[dict]:
+    # fixed-point rate of each (date, currency), built once like TransactionsService does per row
+    rates_scaled: Dict[Tuple[date, str], int] = {}
+    for i, item in enumerate(items):
+        ccy = item.currency.upper().strip()
+        resolved_date, rates = by_date[item.date]
+        if resolved_date is None:
+            yield {"index": i, "error": {"code": "FX_UNAVAILABLE", "message": f"No FX table for {item.date.isoformat()}"}}
+            continue
+        rate = rates.get(ccy)
+        if rate is None:
+            yield {"index": i, "error": {"code": "FX_UNAVAILABLE", "message": f"No {ccy} rate on {resolved_date.isoformat()}"}}
+            continue
+
+        key = (item.date, ccy)
+        rate_scaled = rates_scaled.get(key)
+        if rate_scaled is None:
+            rate_scaled = rates_scaled[key] = rate_to_scaled(rate)
+        try:
+            cents = convert_cents(money_str_to_cents(item.amount), rate_scaled)
+        except (ArithmeticError, ValueError):
+            yield {"index": i, "error": {"code": "VALIDATION_ERROR", "message": f"Invalid amount {item.amount!r}"}}
+            continue
+
+        yield {
+            "index": i,
+            "currency": ccy,
+            "date": item.date.isoformat(),
+            "asOf": resolved_date.isoformat(),
+            "rate": rate,
+            "amount": str(cents_to_decimal(cents)),
+            "amountCents": cents,
+        }
+
+
+def _stream_json(base: str, rows: Iterator[dict]) -> Iterator[str]:
+    yield f'{{"base":{json.dumps(base)},"items":['
+    chunk: list[str] = []
+    first = True
+    for row in rows:
+        chunk.append(json.dumps(row, separators=(",", ":")))
+        if len(chunk) >= FX_CONVERT_CHUNK:
+            yield ("" if first else ",") + ",".join(chunk)
+            chunk, first = [], False
+    if chunk:
+        yield ("" if first else ",") + ",".join(chunk)
+    yield "]}"
+
+
+def _stream_ndjson(rows: Iterator[dict]) -> Iterator[str]:
+    chunk: list[str] = []
+    for row in rows:
+        chunk.append(json.dumps(row, separators=(",", ":")))
+        if len(chunk) >= FX_CONVERT_CHUNK:
+            yield "\n".join(chunk) + "\n"
+            chunk = []
+    if chunk:
+        yield "\n".join(chunk) + "\n"
+
+
+@router.post("/convert")
+async def convert(
+        payload: FxConvertRequest,
+        format: Literal["json", "ndjson"] = Query("json"),
+):
+    """
+    Converts many (amount, currency, date) items into `base` with the same rounding as
+    transactions. Each distinct date is resolved once; results keep the input order
+    (`index`), failed items carry an `error` instead of an amount.
+    """
+    base = payload.base.upper().strip()
+    bases_by_date: Dict[date, set[str]] = defaultdict(set)
+    for item in payload.items:
+        bases_by_date[item.date].add(item.currency.upper().strip())
+
+    by_date = await fx_service_singleton.get_rates_to(base, bases_by_date)
+
+    rows = _convert_rows(payload.items, by_date)
+    if format == "ndjson":
+        return StreamingResponse(_stream_ndjson(rows), media_type="application/x-ndjson")
+    return StreamingResponse(_stream_json(base, rows), media_type="application/json")
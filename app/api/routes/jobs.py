@@ -0,0 +1,34 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.core.db import get_db
+from app.core.errors import AppError
+from app.core.security import get_current_user
+from app.repositories.jobs_repo import JobsRepo
+from app.schemas.job import JobDto
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.get("/{job_id}", response_model=JobDto)
+def get_job(job_id: UUID, user=Depends(get_current_user), db: Session = Depends(get_db)):
+    job = JobsRepo(db).get_for_user(user.id, job_id)
+    if not job:
+        raise AppError("NOT_FOUND", "Job not found", status_code=404)
+
+    return JobDto(
+        id=str(job.id),
+        kind=job.kind,
+        status=job.status,
+        total=job.total,
+        processed=job.processed,
+        succeeded=job.succeeded,
+        failed=job.failed,
+        errors=job.errors or [],
+        message=job.message,
+        createdAt=job.created_at.isoformat(),
+        updatedAt=job.updated_at.isoformat(),
+        finishedAt=job.finished_at.isoformat() if job.finished_at else None,
+    )
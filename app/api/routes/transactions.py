@@ -1,83 +1,150 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Query, UploadFile
 from sqlalchemy.orm import Session
 from uuid import UUID
+from datetime import date, datetime, timedelta
+from typing import Literal
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from app.core.db import get_db
 from app.core.security import get_current_user
 from app.core.config import settings
-from app.core.time import month_range_kyiv
+from app.core.errors import AppError
+from app.core.time import month_range_kyiv, tzinfo
 from app.core.money import cents_to_amount_str
-from app.services.transactions_service import TransactionsService, pm_to_str
-from app.repositories.categories_repo import CategoriesRepo
+from app.services.transactions_service import TransactionsService, pm_to_int, pm_to_str
+from app.services.import_service import CsvImportOptions, CsvImportService
+from app.services.export_service import stream_csv, stream_ndjson
+from app.services.category_resolver import CategoryResolver
 
 from app.schemas.transaction import (
     TransactionsResponse, TransactionCreate, TransactionCreateResponse, TransactionUpdate,
-    TransactionDto, TransactionCategoryDto
+    TransactionDto, TransactionCategoryDto, TransactionBatchCreate, TransactionBulkUpdate,
+    TransactionBulkFilter,
 )
+from app.schemas.job import JobCreateResponse
 
 router = APIRouter(prefix="/transactions", tags=["transactions"])
 
 
 @router.get("", response_model=TransactionsResponse)
 def list_transactions(
-    month: str = Query(..., pattern=r"^\d{4}-\d{2}$"),
+    month: str | None = Query(default=None, pattern=r"^\d{4}-\d{2}$"),
     type: str | None = Query(default=None, pattern="^(expense|income)$"),
     categoryId: str | None = None,
     paymentMethod: str | None = Query(default=None, pattern="^(cash|card|transfer|other)$"),
     q: str | None = None,
+    sort: Literal["date", "relevance"] = Query("date"),
     limit: int | None = None,
     cursor: str | None = None,
     user=Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    from_ts, to_ts = month_range_kyiv(month)
+    # month may be omitted only for a note search, which then covers the whole history
+    if month:
+        from_ts, to_ts = month_range_kyiv(month)
+    elif q and q.strip():
+        from_ts = to_ts = None
+    else:
+        raise AppError("VALIDATION_ERROR", "month is required unless q is given", status_code=400)
     lim = limit or settings.transactions_page_size_default
     lim = min(max(lim, 1), settings.transactions_page_size_max)
 
     svc = TransactionsService(db)
     category_uuid = UUID(categoryId) if categoryId else None
-    items, next_cursor = svc.list(user, from_ts, to_ts, type, category_uuid, paymentMethod, q, lim, cursor)
-
-    cat_repo = CategoriesRepo(db)
-    dtos = []
-    for tx in items:
-        cat = cat_repo.get_user_category(user.id, tx.category_id)
-        dtos.append(
-            TransactionDto(
-                id=str(tx.id),
-                type="income" if tx.type == 1 else "expense",
-                amount=cents_to_amount_str(tx.amount_cents),
-                currency=tx.currency,
-                occurredAt=tx.occurred_at.isoformat(),
-                category=TransactionCategoryDto(
-                    id=str(tx.category_id),
-                    name=cat.name if cat else "Unknown",
-                    icon=cat.icon if cat else None,
-                ),
-                paymentMethod=pm_to_str(tx.payment_method),
-                note=tx.note,
-                createdAt=tx.created_at.isoformat(),
-                updatedAt=tx.updated_at.isoformat(),
-
-                # NEW: FX/original
-                originalAmount=cents_to_amount_str(tx.original_amount_cents),
-                originalCurrency=tx.original_currency,
-                fxRateToBase=float(tx.fx_rate_to_base) if tx.fx_rate_to_base is not None else 1.0,
-                fxDate=tx.fx_date.isoformat() if tx.fx_date is not None else tx.occurred_at.date().isoformat(),
-            )
-        )
-
-    return {"items": dtos, "nextCursor": next_cursor}
-
-@router.post("")
+    items, next_cursor = svc.list(user, from_ts, to_ts, type, category_uuid, paymentMethod, q, lim, cursor, sort)
+
+    # items are built in the TransactionsResponse shape; returning a response directly
+    # skips re-validating every item against response_model (kept for the OpenAPI schema)
+    return JSONResponse({"items": items, "nextCursor": next_cursor})
+
+@router.post("", response_model=TransactionCreateResponse)
 async def create_transaction(
     payload: TransactionCreate,
     user=Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     svc = TransactionsService(db)
-    tx_id = await svc.create(user=user, payload=payload)
-    return {"id": str(tx_id)}
+    tx_id, created = await svc.create(user=user, payload=payload)
+    return {"id": str(tx_id), "created": created}
+
+
+@router.post("/batch")
+async def create_transactions_batch(
+    payload: TransactionBatchCreate,
+    user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    svc = TransactionsService(db)
+    items = await svc.create_batch(user=user, items=payload.items)
+    return {
+        "items": items,
+        "created": sum(1 for x in items if x.get("created")),
+        "failed": sum(1 for x in items if "error" in x),
+    }
+
+
+@router.get("/export")
+def export_transactions(
+    from_: str | None = Query(default=None, alias="from", pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    to: str | None = Query(default=None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    format: Literal["csv", "ndjson"] = Query("csv"),
+    user=Depends(get_current_user),
+):
+    """
+    Full history (or the inclusive from..to local-date range) in occurred_at order,
+    streamed straight from a server-side cursor.
+    """
+    from_ts = to_ts = None
+    if from_:
+        from_ts = datetime.combine(date.fromisoformat(from_), datetime.min.time(), tzinfo=tzinfo())
+    if to:
+        to_ts = datetime.combine(date.fromisoformat(to) + timedelta(days=1), datetime.min.time(), tzinfo=tzinfo())
+    if from_ts and to_ts and from_ts >= to_ts:
+        raise AppError("VALIDATION_ERROR", "from must not be after to", status_code=400)
+
+    filename = f"transactions-{datetime.now(tzinfo()).strftime('%Y%m%d')}.{format}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if format == "ndjson":
+        return StreamingResponse(stream_ndjson(user.id, from_ts, to_ts), media_type="application/x-ndjson", headers=headers)
+    return StreamingResponse(stream_csv(user.id, from_ts, to_ts), media_type="text/csv; charset=utf-8", headers=headers)
+
+
+@router.post("/import", status_code=202, response_model=JobCreateResponse)
+async def import_transactions_csv(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    currency: str | None = Query(default=None, pattern=r"^[A-Za-z]{3}$"),
+    paymentMethod: str = Query(default="card", pattern="^(cash|card|transfer|other)$"),
+    defaultExpenseCategoryId: UUID | None = None,
+    defaultIncomeCategoryId: UUID | None = None,
+    user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Bank statement import. Columns are matched by header (date, amount, currency, category,
+    note/description, type); without a type column negative amounts are expenses.
+    Runs in the background; poll GET /jobs/{jobId} for progress.
+    """
+    options = CsvImportOptions(
+        currency=currency.upper() if currency else None,
+        payment_method=pm_to_int(paymentMethod),
+        default_expense_category_id=defaultExpenseCategoryId,
+        default_income_category_id=defaultIncomeCategoryId,
+    )
+    svc = CsvImportService(db)
+    job = await svc.start(user=user, upload=file, options=options, background_tasks=background_tasks)
+    return {"jobId": str(job.id), "status": job.status}
+
+
+@router.patch("/bulk")
+async def bulk_update_transactions(
+    payload: TransactionBulkUpdate,
+    user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    svc = TransactionsService(db)
+    count = await svc.bulk_update(user=user, payload=payload)
+    return {"updated": count}
 
 
 @router.patch("/{tx_id}")
@@ -92,6 +159,18 @@ async def update_transaction(
     return {"ok": True}
 
 
+@router.delete("")
+def delete_transactions(
+    filters: TransactionBulkFilter,
+    background_tasks: BackgroundTasks,
+    user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    svc = TransactionsService(db)
+    result = svc.bulk_delete(user=user, filters=filters, background_tasks=background_tasks)
+    return JSONResponse(result, status_code=202 if "jobId" in result else 200)
+
+
 @router.delete("/{tx_id}")
 def delete_transaction(tx_id: str, user=Depends(get_current_user), db: Session = Depends(get_db)):
     svc = TransactionsService(db)
@@ -111,11 +190,9 @@ def get_transaction(
     tx = tx_service.get_by_id(user, tx_uuid)
 
     if not tx:
-        from app.core.errors import AppError
         raise AppError("NOT_FOUND", "Transaction not found", status_code=404)
 
-    cat_repo = CategoriesRepo(db)
-    cat = cat_repo.get_user_category(user.id, tx.category_id)
+    cat = CategoryResolver(db, user.id).get(tx.category_id)
 
     return TransactionDto(
         id=str(tx.id),
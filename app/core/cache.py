@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+from cachetools import TLRUCache
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class _CountingTLRUCache(TLRUCache):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.evictions = 0
+        self.expired = 0
+
+    def expire(self, time=None):
+        # called by every write and by sweeps; drops entries whose TTL has passed
+        items = super().expire(time)
+        self.expired += len(items)
+        return items
+
+    def popitem(self):
+        # only called when the cache is full, i.e. a live entry gets evicted
+        item = super().popitem()
+        self.evictions += 1
+        return item
+
+
+class TtlLruCache(Generic[K, V]):
+    """
+    Size-bounded LRU cache with a per-entry TTL on a monotonic clock
+    (cachetools.TLRUCache), plus hit/miss/eviction/expiry counters.
+    Expired entries are swept on writes and at most every `sweep_interval_seconds`
+    on reads, so a worker that stops asking for old keys still releases them.
+    Not thread-safe; meant for code running on the event loop.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        sweep_interval_seconds: float = 60.0,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._cache = _CountingTLRUCache(maxsize=maxsize, ttu=self._ttu, timer=timer)
+        self._timer = timer
+        self._sweep_interval = sweep_interval_seconds
+        self._next_sweep = timer() + sweep_interval_seconds
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _ttu(_key: Any, item: Tuple[Any, float], now: float) -> float:
+        return now + item[1]
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._cache
+
+    def get(self, key: K) -> Optional[V]:
+        if self._timer() >= self._next_sweep:
+            self.sweep()
+        item = self._cache.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return item[0]
+
+    def set(self, key: K, value: V, ttl_seconds: float) -> None:
+        self._cache[key] = (value, ttl_seconds)
+
+    def pop(self, key: K) -> None:
+        self._cache.pop(key, None)
+
+    def sweep(self) -> int:
+        removed = len(self._cache.expire())
+        self._next_sweep = self._timer() + self._sweep_interval
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._cache),
+            "maxSize": int(self._cache.maxsize),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self._cache.evictions,
+            "expired": self._cache.expired,
+        }
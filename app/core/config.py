@@ -15,6 +15,49 @@ class Settings(BaseSettings):
     jwt_issuer: str = "https://clerk.example.com"
     jwt_audience: str | None = None
     jwks_url: str = "https://clerk.example.com/.well-known/jwks.json"
+    jwks_ttl_seconds: int = 3600
+    jwks_refresh_margin_seconds: int = 300  # refresh this long before the TTL runs out
+    jwks_min_refresh_interval_seconds: int = 30  # rate limit for unknown-kid refreshes
+    jwks_timeout_seconds: float = 5.0
+    jwt_claims_cache_size: int = 10000
+
+    # Authenticated user snapshots (see UsersService.resolve_identity)
+    user_identity_cache_size: int = 10000
+    user_identity_cache_ttl_seconds: int = 300
+
+    # FX upstream (NBU) HTTP client
+    fx_http_timeout_seconds: float = 10.0
+    fx_http_connect_timeout_seconds: float = 3.0
+    fx_http_max_connections: int = 10
+    fx_http_max_keepalive_connections: int = 5
+    fx_http_keepalive_expiry_seconds: float = 30.0
+    # comma-separated mirrors of the NBU exchange endpoint (same API), tried after NBU
+    fx_mirror_urls: str = ""
+    fx_upstream_budget_seconds: float = 4.0  # total per table fetch, hedge included
+    fx_hedge_min_delay_seconds: float = 0.15  # hedge fires after max(this, provider p95)
+    fx_hedge_default_delay_seconds: float = 1.0  # until enough latency samples exist
+    fx_breaker_failure_threshold: int = 5
+    fx_breaker_reset_seconds: float = 30.0
+    # serve the latest cached table up to this old when no provider answers
+    fx_stale_max_days: int = 30
+    # optional mmap-backed FX table shared by all workers on the host, e.g. /dev/shm/expense-fx.bin
+    fx_shm_path: str | None = None
+    fx_shm_check_interval_seconds: float = 1.0  # how often readers stat() the file for a new version
+    fx_shm_max_days: int = 3660  # history written to the file
+    # in-memory FX day tables (date x currency float64 matrix, ~0.5 KB per day)
+    fx_matrix_max_days: int = 4096
+    fx_matrix_max_bytes: int = 4 * 1024 * 1024
+    # requested date -> resolved date index, and the "no NBU table" negative cache
+    fx_day_cache_max_entries: int = 20000
+    fx_empty_dates_max_entries: int = 2000
+    fx_cache_sweep_interval_seconds: float = 60.0
+    # background refresh of today's table and early fetch of the next business day's one
+    fx_scheduler_enabled: bool = True
+    fx_scheduler_interval_seconds: float = 300.0  # keep well below the 30 min TTL of today's entry
+    fx_nbu_publish_time: str = "15:30"  # Europe/Kyiv; next-day polling starts after this
+
+    # Admin/ops endpoints are disabled unless a key is configured
+    admin_api_key: str | None = None
 
     cors_origins: str = "http://localhost:3000"
 
@@ -24,6 +67,18 @@ class Settings(BaseSettings):
     # Pagination
     transactions_page_size_default: int = 30
     transactions_page_size_max: int = 100
+    # bulk PATCH with FX recompute: rows per FX batch / UPDATE
+    transactions_bulk_chunk_rows: int = 1000
+    # DELETE /transactions by filter: rows per DELETE + commit; larger deletes run as a job
+    transactions_delete_chunk_rows: int = 1000
+    transactions_delete_sync_max: int = 5000
+
+    # CSV import (POST /transactions/import)
+    import_max_bytes: int = 50 * 1024 * 1024
+    import_chunk_rows: int = 1000  # rows per INSERT / progress update
+
+    # GET /transactions/export: rows per server-side cursor fetch (and per streamed chunk)
+    export_fetch_rows: int = 2000
 
     def cors_origin_list(self) -> List[str]:
         return [x.strip() for x in self.cors_origins.split(",") if x.strip()]
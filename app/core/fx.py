@@ -2,6 +2,11 @@ from __future__ import annotations
 
 from decimal import Decimal, ROUND_HALF_UP
 from datetime import datetime, date
+from typing import List, Sequence, Union
+
+# FX rates are kept as integers in 1e-8 units, the precision of the Numeric(18, 8) columns
+RATE_SCALE = 10 ** 8
+_RATE_QUANT = Decimal("0.00000001")
 
 
 def money_str_to_decimal(s: str) -> Decimal:
@@ -21,10 +26,55 @@ def money_str_to_cents(s: str) -> int:
     return decimal_to_cents(money_str_to_decimal(s))
 
 
-def convert_original_to_base_cents(original_amount_str: str, rate_to_base: Decimal) -> int:
-    original = money_str_to_decimal(original_amount_str)
-    base_amount = (original * rate_to_base).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-    return decimal_to_cents(base_amount)
+def rate_to_scaled(rate: Union[float, Decimal, str]) -> int:
+    """
+    Rate -> integer count of 1e-8 units, rounded half-up (what Numeric(18, 8) would store).
+    Floats go through str() like everywhere else, so 0.1 stays 0.1.
+    """
+    d = rate if isinstance(rate, Decimal) else Decimal(str(rate))
+    return int(d.quantize(_RATE_QUANT, rounding=ROUND_HALF_UP).scaleb(8))
+
+
+def scaled_to_rate(rate_scaled: int) -> Decimal:
+    # exact Decimal for the fx_rate_to_base columns
+    return Decimal(rate_scaled).scaleb(-8)
+
+
+def convert_cents(cents: int, rate_scaled: int) -> int:
+    """
+    cents * rate rounded half-up (away from zero) to whole cents, in pure integer arithmetic.
+    """
+    n = cents * rate_scaled
+    if n >= 0:
+        return (2 * n + RATE_SCALE) // (2 * RATE_SCALE)
+    return -((-2 * n + RATE_SCALE) // (2 * RATE_SCALE))
+
+
+def convert_cents_batch(cents: Sequence[int], rate_scaled: Union[int, Sequence[int]]) -> List[int]:
+    """
+    convert_cents over an array of amounts, with one rate for all or one rate per amount.
+    """
+    d2 = 2 * RATE_SCALE
+    if isinstance(rate_scaled, int):
+        r2 = 2 * rate_scaled
+        return [
+            (c * r2 + RATE_SCALE) // d2 if c * r2 >= 0 else -((-c * r2 + RATE_SCALE) // d2)
+            for c in cents
+        ]
+    if len(rate_scaled) != len(cents):
+        raise ValueError("cents and rates must have the same length")
+    return [
+        (2 * c * r + RATE_SCALE) // d2 if c * r >= 0 else -((-2 * c * r + RATE_SCALE) // d2)
+        for c, r in zip(cents, rate_scaled)
+    ]
+
+
+def convert_original_to_base_cents(original_amount_str: str, rate_to_base: Union[float, Decimal]) -> int:
+    """
+    Original amount string -> base cents. The amount is rounded to cents and the rate to
+    1e-8 first, i.e. exactly the values that get stored, so base = stored original x stored rate.
+    """
+    return convert_cents(money_str_to_cents(original_amount_str), rate_to_scaled(rate_to_base))
 
 
 def dt_to_fx_date(dt: datetime) -> date:
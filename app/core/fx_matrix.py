@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import math
+from array import array
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, List, Optional, Sequence
+
+NAN = float("nan")
+
+
+class FxRateMatrix:
+    """
+    Dense (date x currency) store of UAH-per-unit values in one flat array('d').
+    Each day table is one row of `stride` slots, columns come from a currency-code
+    index, and missing currencies are NaN. Rows are recycled least-recently-used once
+    `max_days` rows or `max_bytes` of row storage are reached.
+    Not thread-safe; meant for code running on the event loop.
+    """
+
+    def __init__(self, max_days: int = 4096, max_bytes: Optional[int] = None, initial_currencies: int = 64) -> None:
+        self.max_days = max_days
+        self.max_bytes = max_bytes
+        self._stride = initial_currencies
+        self._ccy: Dict[str, int] = {}
+        # date -> row number, in LRU order (oldest first)
+        self._rows: "OrderedDict[date, int]" = OrderedDict()
+        self._free_rows: List[int] = []
+        self._data = array("d")
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, d: date) -> bool:
+        return d in self._rows
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.itemsize * len(self._data)
+
+    def currencies(self) -> List[str]:
+        return list(self._ccy)
+
+    def _column(self, code: str) -> int:
+        col = self._ccy.get(code)
+        if col is None:
+            col = len(self._ccy)
+            if col >= self._stride:
+                self._restride(self._stride * 2)
+            self._ccy[code] = col
+        return col
+
+    def _restride(self, stride: int) -> None:
+        old, old_stride = self._data, self._stride
+        rows = len(old) // old_stride
+        data = array("d", [NAN]) * (rows * stride)
+        for r in range(rows):
+            data[r * stride:r * stride + old_stride] = old[r * old_stride:(r + 1) * old_stride]
+        self._data, self._stride = data, stride
+
+    def _can_grow(self) -> bool:
+        if len(self._rows) >= self.max_days:
+            return False
+        if self.max_bytes is not None and (len(self._data) + self._stride) * self._data.itemsize > self.max_bytes:
+            return False
+        return True
+
+    def _row_for_write(self, d: date) -> int:
+        row = self._rows.get(d)
+        if row is not None:
+            self._rows.move_to_end(d)
+            return row
+        if self._free_rows:
+            row = self._free_rows.pop()
+        elif self._can_grow() or not self._rows:
+            row = len(self._data) // self._stride
+            self._data.extend(array("d", [NAN]) * self._stride)
+        else:
+            _, row = self._rows.popitem(last=False)
+            self.evictions += 1
+        self._rows[d] = row
+        return row
+
+    def _offset(self, d: date) -> Optional[int]:
+        row = self._rows.get(d)
+        if row is None:
+            return None
+        self._rows.move_to_end(d)
+        return row * self._stride
+
+    def put_day(self, d: date, rates_map: Dict[str, float]) -> None:
+        cols = [(self._column(code), float(v)) for code, v in rates_map.items()]
+        off = self._row_for_write(d) * self._stride
+        self._data[off:off + self._stride] = array("d", [NAN]) * self._stride
+        for col, v in cols:
+            self._data[off + col] = v
+
+    def discard(self, d: date) -> None:
+        row = self._rows.pop(d, None)
+        if row is not None:
+            self._free_rows.append(row)
+
+    def day_map(self, d: date) -> Optional[Dict[str, float]]:
+        off = self._offset(d)
+        if off is None:
+            return None
+        row = self._data[off:off + self._stride]
+        return {code: row[col] for code, col in self._ccy.items() if not math.isnan(row[col])}
+
+    def latest_on_or_before(self, d: date, since: date) -> Optional[date]:
+        # most recent stored day in [since, d]; linear in the number of rows, used on the stale path only
+        best: Optional[date] = None
+        for day in self._rows:
+            if since <= day <= d and (best is None or day > best):
+                best = day
+        return best
+
+    def has_currency(self, d: date, code: str) -> bool:
+        off = self._offset(d)
+        col = self._ccy.get(code)
+        return off is not None and col is not None and not math.isnan(self._data[off + col])
+
+    def cross_rates(self, dates: Sequence[date], base: str, quotes: Sequence[str]) -> List[List[float]]:
+        """
+        rows[i][j] = how many quotes[j] one `base` buys on dates[i] (UAH cross rate).
+        NaN where the date or a currency is unknown.
+        """
+        b = self._ccy.get(base)
+        cols = [self._ccy.get(q) for q in quotes]
+        out: List[List[float]] = []
+        for d in dates:
+            off = self._offset(d)
+            if off is None or b is None:
+                out.append([NAN] * len(cols))
+                continue
+            row = self._data[off:off + self._stride]
+            num = row[b]
+            out.append([num / row[c] if c is not None and row[c] else NAN for c in cols])
+        return out
+
+    def rate(self, d: date, base: str, quote: str) -> Optional[float]:
+        v = self.cross_rates((d,), base, (quote,))[0][0]
+        return None if math.isnan(v) else v
+
+    def stats(self) -> dict:
+        return {
+            "days": len(self._rows),
+            "maxDays": self.max_days,
+            "maxBytes": self.max_bytes,
+            "currencies": len(self._ccy),
+            "bytes": self.nbytes,
+            "evictions": self.evictions,
+        }
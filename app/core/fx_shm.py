@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import bisect
+import mmap
+import os
+import struct
+import tempfile
+import time
+from array import array
+from datetime import date
+from typing import Any, Dict, Optional, Tuple
+
+# file layout (native byte order, the file never leaves the host):
+#   header | currency codes (8 bytes each) | date ordinals (int32, sorted) | resolved date
+#   ordinals (int32) | row per date (int32) | pad to 8 | rows of float64 UAH-per-unit values,
+#   one per currency (NaN = not quoted)
+MAGIC = b"FXTB"
+FORMAT = 1
+_HEADER = struct.Struct("=4sIQIII4x")  # magic, format, generation, currencies, dates, rows
+_CODE_SIZE = 8
+NAN = float("nan")
+
+
+def _pad8(n: int) -> int:
+    return -n % 8
+
+
+def write_fx_table(path: str, days: Dict[date, Tuple[Dict[str, float], date]]) -> Dict[str, Any]:
+    """
+    Writes `days` (date -> (table of its resolved date, resolved date)) as a new version of
+    the shared table. The file is built next to `path` and swapped in with os.replace, so
+    readers see either the old or the new file, never a partial one.
+    """
+    codes = sorted({code for rates_map, _ in days.values() for code in rates_map})
+    col = {code: i for i, code in enumerate(codes)}
+
+    row_of: Dict[date, int] = {}
+    data = array("d")
+    ordinals = array("i")
+    resolved = array("i")
+    rows = array("i")
+    for d in sorted(days):
+        rates_map, resolved_date = days[d]
+        row = row_of.get(resolved_date)
+        if row is None:
+            row = row_of[resolved_date] = len(row_of)
+            values = array("d", [NAN]) * len(codes)
+            for code, v in rates_map.items():
+                values[col[code]] = v
+            data.extend(values)
+        ordinals.append(d.toordinal())
+        resolved.append(resolved_date.toordinal())
+        rows.append(row)
+
+    generation = time.time_ns()
+    header = _HEADER.pack(MAGIC, FORMAT, generation, len(codes), len(ordinals), len(row_of))
+    code_bytes = b"".join(c.encode("ascii")[:_CODE_SIZE].ljust(_CODE_SIZE, b"\0") for c in codes)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=".fx-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            f.write(code_bytes)
+            f.write(ordinals.tobytes())
+            f.write(resolved.tobytes())
+            f.write(rows.tobytes())
+            f.write(b"\0" * _pad8(12 * len(ordinals)))
+            f.write(data.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+    return {"generation": generation, "dates": len(ordinals), "tables": len(row_of), "currencies": len(codes)}
+
+
+class _Snapshot:
+    """One mapped file version; everything is a memoryview over the mapping (no copies)."""
+
+    __slots__ = ("key", "generation", "cols", "ordinals", "resolved", "rows", "data", "stride", "_mm")
+
+    def __init__(self, key: Tuple[int, int, int], fd: int) -> None:
+        mm = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        magic, fmt, generation, n_ccy, n_dates, n_rows = _HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or fmt != FORMAT:
+            mm.close()
+            raise ValueError("Not an FX table file")
+
+        view = memoryview(mm)
+        off = _HEADER.size
+        codes = bytes(view[off:off + n_ccy * _CODE_SIZE])
+        off += n_ccy * _CODE_SIZE
+        self.cols = {
+            codes[i * _CODE_SIZE:(i + 1) * _CODE_SIZE].rstrip(b"\0").decode("ascii"): i for i in range(n_ccy)
+        }
+        self.ordinals = view[off:off + 4 * n_dates].cast("i")
+        off += 4 * n_dates
+        self.resolved = view[off:off + 4 * n_dates].cast("i")
+        off += 4 * n_dates
+        self.rows = view[off:off + 4 * n_dates].cast("i")
+        off += 4 * n_dates + _pad8(12 * n_dates)
+        self.data = view[off:off + 8 * n_rows * n_ccy].cast("d")
+        self.stride = n_ccy
+        self.key = key
+        self.generation = generation
+        # keeps the mapping alive for as long as this snapshot is referenced
+        self._mm = mm
+
+    def find(self, d: date) -> Optional[int]:
+        o = d.toordinal()
+        i = bisect.bisect_left(self.ordinals, o)
+        if i < len(self.ordinals) and self.ordinals[i] == o:
+            return i
+        return None
+
+
+class SharedFxTable:
+    """
+    Read side of the mmap-backed FX table shared by all worker processes.
+    The current file version is picked up by comparing os.stat() of `path` (at most once
+    per `check_interval_seconds`); swapping versions is a single attribute assignment, so
+    lookups take no locks. Readers of an older version keep their mapping until done.
+    """
+
+    def __init__(self, path: str, check_interval_seconds: float = 1.0) -> None:
+        self.path = path
+        self.check_interval_seconds = check_interval_seconds
+        self._snap: Optional[_Snapshot] = None
+        self._checked_at = 0.0  # monotonic
+        self.reloads = 0
+        self.hits = 0
+        self.misses = 0
+
+    def maybe_reload(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.check_interval_seconds:
+            return
+        self._checked_at = now
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        snap = self._snap
+        if snap is not None and snap.key == key:
+            return
+        with open(self.path, "rb") as f:
+            new = _Snapshot(key, f.fileno())
+        if snap is None or new.generation >= snap.generation:
+            self._snap = new
+            self.reloads += 1
+
+    def lookup(self, d: date) -> Optional[Tuple[date, Dict[str, float]]]:
+        """(resolved date, its table) for `d`, or None. The table is built from the mapped row."""
+        snap = self._snap
+        if snap is None:
+            self.misses += 1
+            return None
+        i = snap.find(d)
+        if i is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+
+        off = snap.rows[i] * snap.stride
+        values = snap.data[off:off + snap.stride]
+        rates_map = {code: values[c] for code, c in snap.cols.items() if values[c] == values[c]}
+        return date.fromordinal(snap.resolved[i]), rates_map
+
+    def stats(self) -> Dict[str, Any]:
+        snap = self._snap
+        return {
+            "path": self.path,
+            "generation": snap.generation if snap is not None else None,
+            "dates": len(snap.ordinals) if snap is not None else 0,
+            "reloads": self.reloads,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
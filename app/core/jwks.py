@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+import jwt
+
+from app.core.config import settings
+from app.core.errors import AppError
+
+logger = logging.getLogger(__name__)
+
+
+class JwksProvider:
+    """
+    Async JWKS key source.
+    Keys are refreshed in the background before the TTL runs out; the last good
+    key set keeps being served while a refresh is running or after it failed.
+    Concurrent refreshes (e.g. a burst of tokens with an unknown kid after a key
+    rotation) share one upstream call, and forced refreshes are rate limited.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        ttl_seconds: int,
+        refresh_margin_seconds: int,
+        min_refresh_interval_seconds: int,
+        timeout_seconds: float,
+    ) -> None:
+        self.url = url
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self.min_refresh_interval_seconds = min_refresh_interval_seconds
+        self.timeout_seconds = timeout_seconds
+
+        # kid -> parsed public key, so requests never re-parse the JWK
+        self._keys: Dict[str, Any] = {}
+        self._fetched_at: float = 0.0  # monotonic
+        self._last_forced_refresh: float = 0.0  # monotonic
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._loop_task: Optional[asyncio.Task] = None
+        self._bg_refresh: Optional[asyncio.Task] = None  # stale-while-revalidate refresh
+
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+
+    async def start(self) -> None:
+        self._client = httpx.AsyncClient(timeout=self.timeout_seconds)
+        try:
+            await self.refresh()
+        except Exception:
+            # do not block startup on the identity provider; get_key retries lazily
+            logger.warning("Initial JWKS fetch failed", exc_info=True)
+        self._loop_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except asyncio.CancelledError:
+                pass
+            self._loop_task = None
+        if self._bg_refresh is not None:
+            self._bg_refresh.cancel()
+            self._bg_refresh = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _age(self) -> float:
+        return time.monotonic() - self._fetched_at
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            if self._keys:
+                delay = self.ttl_seconds - self.refresh_margin_seconds - self._age()
+            else:
+                delay = 0
+            await asyncio.sleep(max(delay, self.min_refresh_interval_seconds))
+            try:
+                await self.refresh()
+            except Exception:
+                logger.warning("JWKS background refresh failed, serving last good key set", exc_info=True)
+
+    def refresh(self) -> asyncio.Future:
+        """
+        Starts a refresh unless one is already running; every caller awaits the same upstream call.
+        """
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._do_refresh())
+        # shield: a cancelled waiter must not cancel the shared fetch
+        return asyncio.shield(self._refresh_task)
+
+    async def _do_refresh(self) -> None:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout_seconds)
+        try:
+            r = await self._client.get(self.url)
+            r.raise_for_status()
+            data = r.json()
+            keys = self._parse_keys(data)
+            if not keys:
+                raise ValueError("JWKS has no keys")
+        except Exception:
+            self.refresh_failures += 1
+            raise
+
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+        self.refreshes += 1
+
+    @staticmethod
+    def _parse_keys(data: Dict[str, Any]) -> Dict[str, Any]:
+        keys: Dict[str, Any] = {}
+        for k in data.get("keys", []):
+            if not isinstance(k, dict) or not k.get("kid"):
+                continue
+            try:
+                keys[k["kid"]] = jwt.algorithms.RSAAlgorithm.from_jwk(json.dumps(k))
+            except Exception:
+                logger.warning("Skipping unparsable JWK kid=%s", k.get("kid"))
+        return keys
+
+    async def _refresh_quietly(self) -> None:
+        try:
+            await self.refresh()
+        except Exception:
+            logger.warning("JWKS refresh failed", exc_info=True)
+
+    async def get_key(self, kid: str) -> Any:
+        key = self._keys.get(kid)
+        if key is not None:
+            self.hits += 1
+            if (
+                self._age() >= self.ttl_seconds
+                and (self._refresh_task is None or self._refresh_task.done())
+                and (self._bg_refresh is None or self._bg_refresh.done())
+            ):
+                # stale-while-revalidate (only reached when the background loop is not running);
+                # the reference keeps the task from being garbage-collected mid-run
+                self._bg_refresh = asyncio.create_task(self._refresh_quietly())
+            return key
+
+        self.misses += 1
+        in_flight = self._refresh_task is not None and not self._refresh_task.done()
+        now = time.monotonic()
+        if in_flight:
+            await self._refresh_quietly()
+        elif not self._keys or now - self._last_forced_refresh >= self.min_refresh_interval_seconds:
+            self._last_forced_refresh = now
+            await self._refresh_quietly()
+
+        key = self._keys.get(kid)
+        if key is not None:
+            return key
+        if not self._keys:
+            raise AppError("UNAUTHORIZED", "Unable to fetch JWKS", status_code=401)
+        raise AppError("UNAUTHORIZED", "Unknown token kid", status_code=401)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "refreshFailures": self.refresh_failures,
+            "keys": len(self._keys),
+            "ageSeconds": round(self._age(), 1) if self._keys else None,
+        }
+
+
+jwks_provider_singleton = JwksProvider(
+    url=settings.jwks_url,
+    ttl_seconds=settings.jwks_ttl_seconds,
+    refresh_margin_seconds=settings.jwks_refresh_margin_seconds,
+    min_refresh_interval_seconds=settings.jwks_min_refresh_interval_seconds,
+    timeout_seconds=settings.jwks_timeout_seconds,
+)
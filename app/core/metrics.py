@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Deque, Dict, Any, Optional
+
+
+class LatencyRecorder:
+    """
+    Running latency stats plus a sliding window of recent samples for percentiles.
+    Not thread-safe; meant for code running on the event loop.
+    """
+
+    def __init__(self, window: int = 512) -> None:
+        self._samples: Deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms: Optional[float] = None
+
+    def record(self, ms: float, ok: bool = True) -> None:
+        self._samples.append(ms)
+        self.count += 1
+        self.total_ms += ms
+        self.last_ms = ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+        if not ok:
+            self.errors += 1
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        idx = min(len(ordered) - 1, int(round(p / 100.0 * (len(ordered) - 1))))
+        return ordered[idx]
+
+    def snapshot(self) -> Dict[str, Any]:
+        def r(v: Optional[float]) -> Optional[float]:
+            return round(v, 1) if v is not None else None
+
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "avgMs": r(self.total_ms / self.count) if self.count else None,
+            "p50Ms": r(self.percentile(50)),
+            "p95Ms": r(self.percentile(95)),
+            "maxMs": r(self.max_ms) if self.count else None,
+            "lastMs": r(self.last_ms),
+        }
@@ -1,39 +1,34 @@
 from __future__ import annotations
 
-import json
+import hashlib
+import hmac
 import time
 import base64
 from typing import Optional, Dict, Any
 
 import jwt
-import requests
-from cachetools import TTLCache
+from cachetools import TLRUCache
 
-from fastapi import Depends, Request
+from fastapi import BackgroundTasks, Depends, Request
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.core.errors import AppError
 from app.core.db import get_db
-from app.services.users_service import UsersService
+from app.core.jwks import jwks_provider_singleton
+from app.services.users_service import UsersService, sync_user_claims
 
 
-_JWKS_CACHE = TTLCache(maxsize=4, ttl=3600)  # 1 hour
+def _claims_ttu(_key, claims: Dict[str, Any], _now: float) -> float:
+    # entries expire together with the token itself
+    return float(claims["exp"])
 
 
-def _fetch_jwks() -> dict:
-    cached = _JWKS_CACHE.get("jwks")
-    if cached:
-        return cached
-    r = requests.get(settings.jwks_url, timeout=5)
-    if r.status_code != 200:
-        raise AppError("UNAUTHORIZED", "Unable to fetch JWKS", status_code=401)
-    jwks = r.json()
-    _JWKS_CACHE["jwks"] = jwks
-    return jwks
+# sha256(token) -> verified claims; repeat tokens skip decoding and signature checks
+_VERIFIED_TOKENS: TLRUCache = TLRUCache(maxsize=settings.jwt_claims_cache_size, ttu=_claims_ttu, timer=time.time)
 
 
-def _get_public_key(token: str):
+async def _get_public_key(token: str):
     try:
         header = jwt.get_unverified_header(token)
     except Exception:
@@ -43,20 +38,7 @@ def _get_public_key(token: str):
     if not kid:
         raise AppError("UNAUTHORIZED", "Token missing kid", status_code=401)
 
-    jwks = _fetch_jwks()
-    keys = jwks.get("keys", [])
-    for k in keys:
-        if k.get("kid") == kid:
-            return jwt.algorithms.RSAAlgorithm.from_jwk(json.dumps(k))
-
-    # refresh once
-    _JWKS_CACHE.pop("jwks", None)
-    jwks = _fetch_jwks()
-    for k in jwks.get("keys", []):
-        if k.get("kid") == kid:
-            return jwt.algorithms.RSAAlgorithm.from_jwk(json.dumps(k))
-
-    raise AppError("UNAUTHORIZED", "Unknown token kid", status_code=401)
+    return await jwks_provider_singleton.get_key(kid)
 
 
 def _extract_bearer_token(request: Request) -> str:
@@ -69,8 +51,13 @@ def _extract_bearer_token(request: Request) -> str:
     return parts[1].strip()
 
 
-def verify_jwt(token: str) -> Dict[str, Any]:
-    key = _get_public_key(token)
+async def verify_jwt(token: str) -> Dict[str, Any]:
+    cache_key = hashlib.sha256(token.encode("utf-8")).digest()
+    cached = _VERIFIED_TOKENS.get(cache_key)
+    if cached is not None:
+        return cached
+
+    key = await _get_public_key(token)
     options = {"require": ["exp", "iss", "sub"]}
     kwargs: Dict[str, Any] = {
         "key": key,
@@ -83,7 +70,6 @@ def verify_jwt(token: str) -> Dict[str, Any]:
 
     try:
         payload = jwt.decode(token, **kwargs)
-        return payload
     except jwt.ExpiredSignatureError:
         raise AppError("UNAUTHORIZED", "Token expired", status_code=401)
     except jwt.InvalidIssuerError:
@@ -93,14 +79,21 @@ def verify_jwt(token: str) -> Dict[str, Any]:
     except Exception:
         raise AppError("UNAUTHORIZED", "Invalid token", status_code=401)
 
+    _VERIFIED_TOKENS[cache_key] = payload
+    return payload
+
+
+async def get_token_payload(request: Request) -> Dict[str, Any]:
+    # async so the key lookup never ties up a worker thread; DB work stays in get_current_user
+    token = _extract_bearer_token(request)
+    return await verify_jwt(token)
+
 
 def get_current_user(
-    request: Request,
+    background_tasks: BackgroundTasks,
+    payload: Dict[str, Any] = Depends(get_token_payload),
     db: Session = Depends(get_db),
 ):
-    token = _extract_bearer_token(request)
-    payload = verify_jwt(token)
-
     external_auth_id = str(payload.get("sub"))
     email = payload.get("email") or payload.get("email_address") or ""
     full_name = payload.get("name")
@@ -109,9 +102,24 @@ def get_current_user(
         raise AppError("UNAUTHORIZED", "Token missing sub", status_code=401)
 
     svc = UsersService(db)
-    user = svc.get_or_create_by_external_auth(
+    user, claims_changed = svc.resolve_identity(
         external_auth_id=external_auth_id,
         email=email,
         full_name=full_name,
     )
+    if claims_changed:
+        background_tasks.add_task(sync_user_claims, external_auth_id, email, full_name)
     return user
+
+
+def verified_tokens_stats() -> Dict[str, Any]:
+    return {"size": len(_VERIFIED_TOKENS), "maxSize": _VERIFIED_TOKENS.maxsize}
+
+
+def require_admin(request: Request) -> None:
+    expected = settings.admin_api_key
+    if not expected:
+        raise AppError("NOT_FOUND", "Not found", status_code=404)
+    provided = request.headers.get("x-admin-key") or ""
+    if not hmac.compare_digest(provided.encode("utf-8"), expected.encode("utf-8")):
+        raise AppError("FORBIDDEN", "Invalid admin key", status_code=403)
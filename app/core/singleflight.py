@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class SingleFlight(Generic[K, V]):
+    """
+    Collapses concurrent calls for the same key into one in-flight awaitable.
+    The first caller starts fn(); every concurrent caller awaits the same result.
+    Nothing is remembered once the call settles, so a failure reaches all current
+    waiters but the next call starts fresh.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: Dict[K, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: K, fn: Callable[[], Awaitable[V]]) -> V:
+        fut = self._inflight.get(key)
+        if fut is None:
+            fut = asyncio.ensure_future(fn())
+            self._inflight[key] = fut
+            fut.add_done_callback(lambda f, k=key: self._settle(k, f))
+        # shield: one cancelled waiter must not cancel the shared call for the others
+        return await asyncio.shield(fut)
+
+    def _settle(self, key: K, fut: asyncio.Future) -> None:
+        if self._inflight.get(key) is fut:
+            del self._inflight[key]
+        if not fut.cancelled():
+            fut.exception()  # mark retrieved even if every waiter went away
@@ -1,9 +1,13 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
 from app.core.errors import AppError, app_error_handler, validation_error_handler
 from app.core.logging import RequestLoggingMiddleware
+from app.core.jwks import jwks_provider_singleton
+from app.services.fx_service import fx_service_singleton
 
 from app.api.routes.me import router as me_router
 from app.api.routes.categories import router as categories_router
@@ -12,11 +16,27 @@ from app.api.routes.budgets import router as budgets_router
 from app.api.routes.dashboard import router as dashboard_router
 from app.api.routes.stats import router as stats_router
 from app.api.routes.fx import router as fx_router
+from app.api.routes.admin import router as admin_router
+from app.api.routes.jobs import router as jobs_router
 
 from fastapi.exceptions import RequestValidationError
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await jwks_provider_singleton.start()
+    await fx_service_singleton.startup()
+    if settings.fx_scheduler_enabled:
+        await fx_service_singleton.start_scheduler()
+    try:
+        yield
+    finally:
+        await fx_service_singleton.stop_scheduler()
+        await fx_service_singleton.shutdown()
+        await jwks_provider_singleton.stop()
+
+
 def create_app() -> FastAPI:
-    app = FastAPI(title=settings.app_name)
+    app = FastAPI(title=settings.app_name, lifespan=lifespan)
 
     app.add_middleware(RequestLoggingMiddleware)
 
@@ -39,6 +59,8 @@ def create_app() -> FastAPI:
     app.include_router(dashboard_router)
     app.include_router(stats_router)
     app.include_router(fx_router)
+    app.include_router(jobs_router)
+    app.include_router(admin_router)
 
     return app
 
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from datetime import datetime, date
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import DateTime, String, Date, Numeric, Index
+from app.core.db import Base
+
+
+class FxDayRate(Base):
+    """
+    One NBU day table row: UAH per 1 unit of `currency` for a requested date.
+    Weekend/holiday dates store the table of the business day they resolved to.
+    """
+    __tablename__ = "fx_rates"
+    __table_args__ = (
+        Index("ix_fx_rates_resolved_date", "resolved_date"),
+    )
+
+    date: Mapped[date] = mapped_column(Date, primary_key=True)
+    currency: Mapped[str] = mapped_column(String(8), primary_key=True)
+
+    uah_per_unit = mapped_column(Numeric(18, 8), nullable=False)
+    resolved_date: Mapped[date] = mapped_column(Date, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
@@ -0,0 +1,36 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import String, Integer, DateTime, ForeignKey, Index, Text, JSON
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.db import Base
+
+
+class Job(Base):
+    """
+    Background job run after the request returned (CSV import, bulk delete).
+    Progress counters are updated per processed chunk.
+    """
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_user_created", "user_id", "created_at"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+
+    # import_csv, delete_transactions
+    kind: Mapped[str] = mapped_column(String(32), nullable=False)
+    # queued, running, done, failed
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default="queued")
+
+    total: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    processed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    succeeded: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    failed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # first errors only ([{"row": n, "code": ..., "message": ...}]), so the row stays small
+    errors: Mapped[list] = mapped_column(JSON, nullable=False, default=list)
+    message: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -1,8 +1,9 @@
 import uuid
 from datetime import datetime
 from sqlalchemy import (
-    String, DateTime, SmallInteger, BigInteger, ForeignKey, Index, UniqueConstraint, Text, Date, Numeric
+    String, DateTime, SmallInteger, BigInteger, ForeignKey, Index, UniqueConstraint, Text, Date, Numeric, Computed
 )
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column
 from app.core.db import Base
 
@@ -14,6 +15,8 @@ class Transaction(Base):
         Index("ix_tx_user_type_occurred_desc", "user_id", "type", "occurred_at"),
         Index("ix_tx_user_category_occurred_desc", "user_id", "category_id", "occurred_at"),
         UniqueConstraint("user_id", "client_ref", name="uq_tx_user_client_ref"),
+        Index("ix_tx_note_trgm", "note", postgresql_using="gin", postgresql_ops={"note": "gin_trgm_ops"}),
+        Index("ix_tx_note_tsv", "note_tsv", postgresql_using="gin"),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
@@ -32,6 +35,10 @@ class Transaction(Base):
     payment_method: Mapped[int] = mapped_column(SmallInteger, nullable=False, default=1)
 
     note: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # generated by the DB, only used for search; never loaded
+    note_tsv = mapped_column(
+        TSVECTOR, Computed("to_tsvector('simple', coalesce(note, ''))", persisted=True), nullable=True, deferred=True
+    )
 
     # 0=manual,1=import_csv
     source: Mapped[int] = mapped_column(SmallInteger, nullable=False, default=0)
@@ -18,6 +18,14 @@ class CategoriesRepo:
         q = select(Category).where(Category.user_id == user_id, Category.id == category_id)
         return self.db.execute(q).scalar_one_or_none()
 
+    def map_by_ids(self, user_id, category_ids) -> dict:
+        # id -> Category for the given ids in one query; unknown/foreign ids are absent
+        ids = set(category_ids)
+        if not ids:
+            return {}
+        q = select(Category).where(Category.user_id == user_id, Category.id.in_(ids))
+        return {c.id: c for c in self.db.execute(q).scalars().all()}
+
     def get_by_name(self, user_id, type_int: int, name: str) -> Category | None:
         q = select(Category).where(Category.user_id == user_id, Category.type == type_int, Category.name == name)
         return self.db.execute(q).scalar_one_or_none()
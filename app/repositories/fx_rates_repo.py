@@ -0,0 +1,91 @@
+from datetime import date, datetime
+from typing import Dict, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.models.fx_rate import FxDayRate
+
+
+class FxRatesRepo:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_day(self, d: date) -> Optional[Tuple[Dict[str, float], date]]:
+        q = select(FxDayRate.currency, FxDayRate.uah_per_unit, FxDayRate.resolved_date).where(FxDayRate.date == d)
+        rows = self.db.execute(q).all()
+        if not rows:
+            return None
+        rates_map = {cur: float(rate) for cur, rate, _ in rows}
+        return rates_map, rows[0][2]
+
+    def get_days(self, start: date, end: date) -> Dict[date, Tuple[Dict[str, float], date]]:
+        """
+        Every stored date in [start, end] -> (table of its resolved date, resolved date).
+        Gap dates share the table object of their resolved date, which is read only once.
+        """
+        q = select(FxDayRate.date, FxDayRate.resolved_date).where(FxDayRate.date >= start, FxDayRate.date <= end).distinct()
+        resolved_by_date = dict(self.db.execute(q).all())
+        if not resolved_by_date:
+            return {}
+
+        q = select(FxDayRate.date, FxDayRate.currency, FxDayRate.uah_per_unit).where(
+            FxDayRate.date.in_(set(resolved_by_date.values()))
+        )
+        tables: Dict[date, Dict[str, float]] = {}
+        for d, cur, rate in self.db.execute(q).all():
+            tables.setdefault(d, {})[cur] = float(rate)
+
+        return {d: (tables[r], r) for d, r in resolved_by_date.items() if r in tables}
+
+    def latest_day(self, d: date, since: date) -> Optional[Tuple[Dict[str, float], date]]:
+        # most recent published table in [since, d]
+        q = select(func.max(FxDayRate.date)).where(
+            FxDayRate.date <= d,
+            FxDayRate.date >= since,
+            FxDayRate.date == FxDayRate.resolved_date,
+        )
+        latest = self.db.execute(q).scalar()
+        if latest is None:
+            return None
+        return self.get_day(latest)
+
+    def signature(self) -> Tuple[int, Optional[datetime]]:
+        # cheap change detector: (row count, newest updated_at); upsert_day bumps updated_at
+        # whenever a stored rate or resolution changes
+        q = select(func.count(), func.max(FxDayRate.updated_at))
+        count, newest = self.db.execute(q).one()
+        return int(count), newest
+
+    def existing_dates(self, start: date, end: date) -> Set[date]:
+        q = select(FxDayRate.date).where(FxDayRate.date >= start, FxDayRate.date <= end).distinct()
+        return set(self.db.execute(q).scalars().all())
+
+    def upsert_day(self, d: date, rates_map: Dict[str, float], resolved_date: date) -> None:
+        now = datetime.utcnow()
+        values = [
+            {
+                "date": d,
+                "currency": cur,
+                "uah_per_unit": rate,
+                "resolved_date": resolved_date,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for cur, rate in rates_map.items()
+        ]
+        if not values:
+            return
+        q = pg_insert(FxDayRate).values(values)
+        # rewriting an identical row is a no-op, so re-prefetching does not look like a change
+        q = q.on_conflict_do_update(
+            index_elements=[FxDayRate.date, FxDayRate.currency],
+            set_={
+                "uah_per_unit": q.excluded.uah_per_unit,
+                "resolved_date": q.excluded.resolved_date,
+                "updated_at": q.excluded.updated_at,
+            },
+            where=(FxDayRate.uah_per_unit != q.excluded.uah_per_unit)
+            | (FxDayRate.resolved_date != q.excluded.resolved_date),
+        )
+        self.db.execute(q)
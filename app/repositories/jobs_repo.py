@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from app.models.job import Job
+
+
+class JobsRepo:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create(self, job: Job) -> Job:
+        self.db.add(job)
+        self.db.flush()
+        return job
+
+    def get_for_user(self, user_id, job_id) -> Job | None:
+        q = select(Job).where(Job.user_id == user_id, Job.id == job_id)
+        return self.db.execute(q).scalar_one_or_none()
+
+    def update_fields(self, job_id, fields: dict) -> int:
+        fields = {**fields, "updated_at": datetime.utcnow()}
+        q = update(Job).where(Job.id == job_id).values(**fields)
+        res = self.db.execute(q)
+        return res.rowcount or 0
@@ -1,6 +1,8 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import select, update, delete, and_, or_
+from sqlalchemy import select, insert, update, delete, and_, or_, literal, func, cast, tuple_, Float
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from app.models.transaction import Transaction
+from app.models.category import Category
 
 
 class TransactionsRepo:
@@ -15,6 +17,76 @@ class TransactionsRepo:
         q = select(Transaction).where(Transaction.user_id == user_id, Transaction.client_ref == client_ref)
         return self.db.execute(q).scalar_one_or_none()
 
+    def ids_by_client_refs(self, user_id, client_refs) -> dict:
+        refs = set(client_refs)
+        if not refs:
+            return {}
+        q = select(Transaction.client_ref, Transaction.id).where(
+            Transaction.user_id == user_id, Transaction.client_ref.in_(refs)
+        )
+        return dict(self.db.execute(q).all())
+
+    def insert_many(self, rows: list[dict], skip_existing_client_refs: bool = False) -> int:
+        # one multi-row INSERT; rows carry their own ids. Returns the number of rows inserted.
+        if not rows:
+            return 0
+        if skip_existing_client_refs:
+            q = pg_insert(Transaction).values(rows).on_conflict_do_nothing(constraint="uq_tx_user_client_ref")
+        else:
+            q = insert(Transaction).values(rows)
+        return self.db.execute(q).rowcount or 0
+
+    def insert_many_returning_ids(self, rows: list[dict]) -> set:
+        # rows whose clientRef is already stored are skipped; their ids are not returned
+        if not rows:
+            return set()
+        q = (
+            pg_insert(Transaction)
+            .values(rows)
+            .on_conflict_do_nothing(constraint="uq_tx_user_client_ref")
+            .returning(Transaction.id)
+        )
+        return set(self.db.execute(q).scalars().all())
+
+    def insert_idempotent(self, row: dict) -> tuple:
+        """
+        Inserts one row and returns (id, created). When the row's clientRef is already
+        stored, nothing is written and the stored id is returned with created=False,
+        in the same statement.
+        """
+        if row.get("client_ref") is None:
+            self.db.execute(insert(Transaction).values(row))
+            return row["id"], True
+
+        ins = (
+            pg_insert(Transaction)
+            .values(row)
+            .on_conflict_do_nothing(constraint="uq_tx_user_client_ref")
+            .returning(Transaction.id)
+            .cte("ins")
+        )
+        stored = select(Transaction.id, literal(False)).where(
+            Transaction.user_id == row["user_id"], Transaction.client_ref == row["client_ref"]
+        )
+        q = select(ins.c.id, literal(True)).union_all(stored).limit(1)
+        hit = self.db.execute(q).first()
+        if hit is None:
+            # the conflicting row was committed by a concurrent request after this
+            # statement's snapshot was taken; a new statement sees it
+            tx = self.get_by_client_ref(row["user_id"], row["client_ref"])
+            return tx.id, False
+        return hit[0], hit[1]
+
+    def client_ref_and_category_type(self, user_id, client_ref: str | None, category_id) -> tuple:
+        """(id of the transaction stored under client_ref or None, type of the category or None), one query."""
+        cat_type = select(Category.type).where(Category.user_id == user_id, Category.id == category_id)
+        if client_ref is None:
+            return None, self.db.execute(cat_type).scalar_one_or_none()
+        stored = select(Transaction.id).where(Transaction.user_id == user_id, Transaction.client_ref == client_ref)
+        q = select(stored.scalar_subquery(), cat_type.scalar_subquery())
+        tx_id, type_int = self.db.execute(q).one()
+        return tx_id, type_int
+
     def create(self, tx: Transaction) -> Transaction:
         self.db.add(tx)
         self.db.flush()
@@ -34,7 +106,116 @@ class TransactionsRepo:
         res = self.db.execute(q)
         return res.rowcount or 0
 
-    def list_cursor(
+    def export_rows(self, user_id, from_ts, to_ts, batch_size: int):
+        """
+        Plain column rows (no ORM objects) in occurred_at order, fetched from a server-side
+        cursor `batch_size` rows at a time; iterate with .partitions().
+        """
+        q = select(
+            Transaction.id,
+            Transaction.type,
+            Transaction.amount_cents,
+            Transaction.currency,
+            Transaction.occurred_at,
+            Transaction.category_id,
+            Transaction.payment_method,
+            Transaction.note,
+            Transaction.original_amount_cents,
+            Transaction.original_currency,
+            Transaction.fx_rate_to_base,
+            Transaction.fx_date,
+            Transaction.created_at,
+        ).where(Transaction.user_id == user_id)
+        if from_ts is not None:
+            q = q.where(Transaction.occurred_at >= from_ts)
+        if to_ts is not None:
+            q = q.where(Transaction.occurred_at < to_ts)
+        q = q.order_by(Transaction.occurred_at.asc(), Transaction.id.asc())
+        return self.db.execute(q.execution_options(yield_per=batch_size))
+
+    @staticmethod
+    def filter_clauses(
+        user_id,
+        from_ts=None,
+        to_ts=None,
+        type_int: int | None = None,
+        category_id=None,
+        payment_method_int: int | None = None,
+        q_text: str | None = None,
+        ids=None,
+        source: int | None = None,
+        client_ref_prefix: str | None = None,
+    ) -> list:
+        """WHERE clauses of the transaction list filters; unset filters add nothing."""
+        clauses = [Transaction.user_id == user_id]
+        if ids:
+            clauses.append(Transaction.id.in_(set(ids)))
+        if source is not None:
+            clauses.append(Transaction.source == source)
+        if client_ref_prefix:
+            clauses.append(Transaction.client_ref.like(f"{escape_like(client_ref_prefix)}%", escape="\\"))
+        if from_ts is not None:
+            clauses.append(Transaction.occurred_at >= from_ts)
+        if to_ts is not None:
+            clauses.append(Transaction.occurred_at < to_ts)
+        if type_int is not None:
+            clauses.append(Transaction.type == type_int)
+        if category_id is not None:
+            clauses.append(Transaction.category_id == category_id)
+        if payment_method_int is not None:
+            clauses.append(Transaction.payment_method == payment_method_int)
+        if q_text:
+            # whole words via ix_tx_note_tsv, substrings via ix_tx_note_trgm (BitmapOr)
+            clauses.append(
+                or_(
+                    Transaction.note_tsv.op("@@")(_note_tsquery(q_text)),
+                    Transaction.note.ilike(f"%{escape_like(q_text)}%", escape="\\"),
+                )
+            )
+        return clauses
+
+    def bulk_update(self, clauses: list, fields: dict) -> int:
+        # one set-based UPDATE over every row matching `clauses`
+        q = update(Transaction).where(*clauses).values(**fields).execution_options(synchronize_session=False)
+        return self.db.execute(q).rowcount or 0
+
+    def count(self, clauses: list) -> int:
+        return self.db.execute(select(func.count()).select_from(Transaction).where(*clauses)).scalar_one()
+
+    def delete_chunk(self, clauses: list, limit: int) -> int:
+        # DELETE ... WHERE id IN (SELECT id ... LIMIT n): bounded lock set and WAL per statement
+        ids = select(Transaction.id).where(*clauses).limit(limit).scalar_subquery()
+        q = delete(Transaction).where(Transaction.id.in_(ids)).execution_options(synchronize_session=False)
+        return self.db.execute(q).rowcount or 0
+
+    def update_by_ids(self, rows: list[dict]) -> None:
+        # per-row values in one executemany; each dict carries "id"
+        if rows:
+            self.db.execute(update(Transaction), rows)
+
+    def exists_with_other_type(self, clauses: list, type_int: int) -> bool:
+        q = select(Transaction.id).where(*clauses, Transaction.type != type_int).limit(1)
+        return self.db.execute(q).first() is not None
+
+    def fx_source_rows(self, clauses: list, after_id, limit: int) -> list:
+        """Matching rows with what FX conversion needs, in id order, `limit` rows after `after_id`."""
+        q = select(
+            Transaction.id, Transaction.original_amount_cents, Transaction.original_currency, Transaction.occurred_at
+        ).where(*clauses)
+        if after_id is not None:
+            q = q.where(Transaction.id > after_id)
+        return self.db.execute(q.order_by(Transaction.id.asc()).limit(limit)).all()
+
+    @staticmethod
+    def note_rank(q_text: str):
+        # word hits (ts_rank_cd) first, then how closely the note contains the text
+        return cast(
+            func.ts_rank_cd(Transaction.note_tsv, _note_tsquery(q_text))
+            + func.word_similarity(q_text, func.coalesce(Transaction.note, "")),
+            Float,
+        )
+
+    def list_query(
         self,
         user_id,
         from_ts,
@@ -46,21 +227,24 @@ class TransactionsRepo:
         limit: int,
         cursor_occurred_at,
         cursor_id,
+        sort: str = "date",
+        cursor_rank: float | None = None,
+        projection: bool = False,
     ):
-        q = select(Transaction).where(
-            Transaction.user_id == user_id,
-            Transaction.occurred_at >= from_ts,
-            Transaction.occurred_at < to_ts,
-        )
+        if projection:
+            q = select(*LIST_COLUMNS).select_from(Transaction).outerjoin(
+                Category, and_(Category.id == Transaction.category_id, Category.user_id == Transaction.user_id)
+            )
+        else:
+            q = select(Transaction)
+        q = q.where(*self.filter_clauses(user_id, from_ts, to_ts, type_int, category_id, payment_method_int, q_text))
 
-        if type_int is not None:
-            q = q.where(Transaction.type == type_int)
-        if category_id is not None:
-            q = q.where(Transaction.category_id == category_id)
-        if payment_method_int is not None:
-            q = q.where(Transaction.payment_method == payment_method_int)
-        if q_text:
-            q = q.where(Transaction.note.ilike(f"%{q_text}%"))
+        if sort == "relevance" and q_text:
+            rank = self.note_rank(q_text)
+            q = q.add_columns(rank.label("rank"))
+            if cursor_rank is not None and cursor_occurred_at and cursor_id:
+                q = q.where(tuple_(rank, Transaction.occurred_at, Transaction.id) < (cursor_rank, cursor_occurred_at, cursor_id))
+            return q.order_by(rank.desc(), Transaction.occurred_at.desc(), Transaction.id.desc()).limit(limit)
 
         # cursor condition
         if cursor_occurred_at and cursor_id:
@@ -71,5 +255,87 @@ class TransactionsRepo:
                 )
             )
 
-        q = q.order_by(Transaction.occurred_at.desc(), Transaction.id.desc()).limit(limit)
-        return list(self.db.execute(q).scalars().all())
+        return q.order_by(Transaction.occurred_at.desc(), Transaction.id.desc()).limit(limit)
+
+    def list_cursor(
+        self,
+        user_id,
+        from_ts,
+        to_ts,
+        type_int: int | None,
+        category_id,
+        payment_method_int: int | None,
+        q_text: str | None,
+        limit: int,
+        cursor_occurred_at,
+        cursor_id,
+        sort: str = "date",
+        cursor_rank: float | None = None,
+    ) -> list:
+        """
+        Page of transactions, newest first. With sort="relevance" (needs q_text) the
+        items are (transaction, rank) pairs, best match first.
+        """
+        q = self.list_query(
+            user_id, from_ts, to_ts, type_int, category_id, payment_method_int, q_text,
+            limit, cursor_occurred_at, cursor_id, sort, cursor_rank,
+        )
+        res = self.db.execute(q)
+        if sort == "relevance" and q_text:
+            return [(tx, rank) for tx, rank in res.all()]
+        return list(res.scalars().all())
+
+
+    def list_rows(
+        self,
+        user_id,
+        from_ts,
+        to_ts,
+        type_int: int | None,
+        category_id,
+        payment_method_int: int | None,
+        q_text: str | None,
+        limit: int,
+        cursor_occurred_at,
+        cursor_id,
+        sort: str = "date",
+        cursor_rank: float | None = None,
+    ) -> list:
+        """
+        Same page as list_cursor, as plain tuples of LIST_COLUMNS (category name and icon
+        joined in) instead of ORM instances; with sort="relevance" the rank is appended.
+        """
+        q = self.list_query(
+            user_id, from_ts, to_ts, type_int, category_id, payment_method_int, q_text,
+            limit, cursor_occurred_at, cursor_id, sort, cursor_rank, projection=True,
+        )
+        return self.db.execute(q).all()
+
+
+# column order is relied on by TransactionsService.list (tuple unpacking)
+LIST_COLUMNS = (
+    Transaction.id,
+    Transaction.type,
+    Transaction.amount_cents,
+    Transaction.currency,
+    Transaction.occurred_at,
+    Transaction.category_id,
+    Transaction.payment_method,
+    Transaction.note,
+    Transaction.created_at,
+    Transaction.updated_at,
+    Transaction.original_amount_cents,
+    Transaction.original_currency,
+    Transaction.fx_rate_to_base,
+    Transaction.fx_date,
+    Category.name,
+    Category.icon,
+)
+
+
+def escape_like(s: str) -> str:
+    return s.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _note_tsquery(q_text: str):
+    return func.websearch_to_tsquery("simple", q_text)
@@ -0,0 +1,16 @@
+from datetime import date
+
+from pydantic import BaseModel, Field
+
+FX_CONVERT_MAX_ITEMS = 10000
+
+
+class FxConvertItem(BaseModel):
+    amount: str = Field(..., max_length=32)  # original amount, e.g. "12.50"
+    currency: str = Field(..., min_length=3, max_length=8)
+    date: date
+
+
+class FxConvertRequest(BaseModel):
+    base: str = Field(..., min_length=3, max_length=8)  # target currency
+    items: list[FxConvertItem] = Field(..., max_length=FX_CONVERT_MAX_ITEMS)
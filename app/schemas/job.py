@@ -0,0 +1,29 @@
+from pydantic import BaseModel
+
+
+class JobErrorDto(BaseModel):
+    row: int
+    code: str
+    message: str
+
+
+class JobDto(BaseModel):
+    id: str
+    kind: str
+    status: str
+
+    total: int | None = None
+    processed: int
+    succeeded: int
+    failed: int
+    errors: list[JobErrorDto]
+    message: str | None = None
+
+    createdAt: str
+    updatedAt: str
+    finishedAt: str | None = None
+
+
+class JobCreateResponse(BaseModel):
+    jobId: str
+    status: str
@@ -1,7 +1,7 @@
-from datetime import datetime
+from datetime import date, datetime
 
-from pydantic import BaseModel, Field
-from typing import Literal, Optional
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints
+from typing import Annotated, Any, Literal, Optional
 from uuid import UUID
 
 from app.schemas.category import CategoryDto
@@ -50,8 +50,16 @@ class TransactionCreate(BaseModel):
     clientRef: str | None = Field(default=None, max_length=64)
 
 
+class TransactionBatchCreate(BaseModel):
+    # items are validated one by one so a bad item (even a non-object) does not reject
+    # the whole batch
+    items: list[Any] = Field(..., min_length=1, max_length=500)
+
+
 class TransactionCreateResponse(BaseModel):
     id: str
+    # False when clientRef matched an already stored transaction
+    created: bool = True
 
 
 class TransactionUpdate(BaseModel):
@@ -62,3 +70,35 @@ class TransactionUpdate(BaseModel):
     paymentMethod: PaymentMethod | None = None
     note: str | None = Field(default=None, max_length=500)
     type: TransactionType
+
+
+class TransactionBulkFilter(BaseModel):
+    # same filters as the list (from/to are inclusive local dates), plus explicit ids;
+    # all given filters must match
+    model_config = ConfigDict(populate_by_name=True)
+
+    ids: list[UUID] | None = Field(default=None, min_length=1, max_length=1000)
+    from_: date | None = Field(default=None, alias="from")
+    to: date | None = None
+    type: TransactionType | None = None
+    categoryId: UUID | None = None
+    paymentMethod: PaymentMethod | None = None
+    # stripped before the length check, so a blank q is rejected instead of matching everything
+    q: Annotated[str, StringConstraints(strip_whitespace=True, min_length=1, max_length=200)] | None = None
+    source: Literal["manual", "import_csv"] | None = None
+    importJobId: UUID | None = None  # rows created by one CSV import job
+
+
+class TransactionBulkSet(BaseModel):
+    categoryId: UUID | None = None
+    paymentMethod: PaymentMethod | None = None
+    note: str | None = Field(default=None, max_length=500)  # explicit null clears the note
+    # these re-run FX conversion for every matched row
+    amount: str | None = None
+    currency: str | None = Field(default=None, min_length=3, max_length=3)
+    occurredAt: datetime | None = None
+
+
+class TransactionBulkUpdate(BaseModel):
+    filter: TransactionBulkFilter
+    set: TransactionBulkSet
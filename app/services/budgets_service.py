@@ -1,16 +1,16 @@
 from datetime import datetime, date
-from decimal import Decimal
 from uuid import UUID
 from sqlalchemy.orm import Session
 from sqlalchemy import select, func
 
 from app.core.errors import AppError
 from app.core.money import cents_to_amount_str, amount_str_to_cents
-from app.core.fx import convert_original_to_base_cents, money_str_to_cents
+from app.core.fx import RATE_SCALE, convert_cents, money_str_to_cents, rate_to_scaled, scaled_to_rate
 from app.services.fx_service import fx_service_singleton
 from app.core.time import month_range_kyiv
 from app.repositories.budgets_repo import BudgetsRepo
 from app.repositories.categories_repo import CategoriesRepo
+from app.services.category_resolver import CategoryResolver
 from app.models.budget import Budget
 from app.models.transaction import Transaction
 
@@ -52,20 +52,20 @@ class BudgetsService:
         original_currency = _normalize_ccy(original_currency)
 
         if original_currency == base:
-            rate = Decimal("1")
+            rate_scaled = RATE_SCALE
         else:
             fx = await fx_service_singleton.get_rate(base=original_currency, quote=base, as_of=fx_date)
-            rate = Decimal(str(fx.rate))
+            rate_scaled = rate_to_scaled(fx.rate)
 
-        limit_cents_base = convert_original_to_base_cents(original_limit, rate)
         original_limit_cents = money_str_to_cents(original_limit)
+        limit_cents_base = convert_cents(original_limit_cents, rate_scaled)
 
         return {
             "limit_cents": limit_cents_base,
             "currency": base,
             "original_limit_cents": original_limit_cents,
             "original_currency": original_currency,
-            "fx_rate_to_base": rate,
+            "fx_rate_to_base": scaled_to_rate(rate_scaled),
             "fx_date": fx_date,
         }
 
@@ -85,8 +85,9 @@ class BudgetsService:
         # FX date = first day of month (consistent)
         fx_date = date.fromisoformat(f"{month}-01")
         fx = await fx_service_singleton.get_rate(base=orig_cur, quote=base_cur, as_of=fx_date)
+        rate_scaled = rate_to_scaled(fx.rate)
 
-        limit_cents_base = int(round(orig_cents * fx.rate))
+        limit_cents_base = convert_cents(orig_cents, rate_scaled)
 
         b = Budget(
             user_id=user.id,
@@ -98,7 +99,7 @@ class BudgetsService:
 
             original_limit_cents=orig_cents,
             original_currency=orig_cur,
-            fx_rate_to_base=fx.rate,
+            fx_rate_to_base=scaled_to_rate(rate_scaled),
             fx_date=fx.as_of,
         )
         self.db.add(b)
@@ -120,13 +121,14 @@ class BudgetsService:
         orig_cents = amount_str_to_cents(limit_str)
         fx_date = date.fromisoformat(f"{b.month}-01")
         fx = await fx_service_singleton.get_rate(base=orig_cur, quote=base_cur, as_of=fx_date)
+        rate_scaled = rate_to_scaled(fx.rate)
 
         b.original_limit_cents = orig_cents
         b.original_currency = orig_cur
-        b.fx_rate_to_base = fx.rate
+        b.fx_rate_to_base = scaled_to_rate(rate_scaled)
         b.fx_date = fx.as_of
 
-        b.limit_cents = int(round(orig_cents * fx.rate))
+        b.limit_cents = convert_cents(orig_cents, rate_scaled)
 
         self.db.commit()
         self.db.refresh(b)
@@ -198,10 +200,13 @@ class BudgetsService:
             spent_orig_map.setdefault(cat_id, {})
             spent_orig_map[cat_id][code] = int(cents)
 
+        categories = CategoryResolver(self.db, user.id)
+        categories.load(category_ids)
+
         # build DTOs
         items = []
         for b in budgets:
-            cat = self.cat_repo.get_user_category(user.id, b.category_id)
+            cat = categories.get(b.category_id)
 
             spent_cents = spent_base_map.get(b.category_id, 0)
             remaining_cents = int(b.limit_cents) - spent_cents
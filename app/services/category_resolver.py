@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.models.category import Category
+from app.repositories.categories_repo import CategoriesRepo
+
+
+class CategoryResolver:
+    """
+    Per-request category lookup for one user. Read paths collect the ids they need and call
+    load() once (one IN query); each id is queried at most once per resolver, so later
+    get() calls are free. Unknown and foreign ids resolve to None.
+    """
+
+    def __init__(self, db: Session, user_id):
+        self.cat_repo = CategoriesRepo(db)
+        self.user_id = user_id
+        self._cats: Dict[UUID, Category | None] = {}
+
+    def load(self, category_ids: Iterable) -> Dict[UUID, Category | None]:
+        ids = set(category_ids)
+        missing = ids - self._cats.keys()
+        if missing:
+            found = self.cat_repo.map_by_ids(self.user_id, missing)
+            for cid in missing:
+                self._cats[cid] = found.get(cid)
+        return {cid: self._cats[cid] for cid in ids}
+
+    def get(self, category_id) -> Category | None:
+        return self.load((category_id,))[category_id]
+
+    def name(self, category_id) -> str:
+        cat = self.get(category_id)
+        return cat.name if cat else "Unknown"
+
+    def icon(self, category_id) -> str | None:
+        cat = self.get(category_id)
+        return cat.icon if cat else None
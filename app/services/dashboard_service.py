@@ -6,16 +6,16 @@ from sqlalchemy import select, func, case
 from app.core.time import month_range_kyiv
 from app.core.money import cents_to_amount_str
 from app.models.transaction import Transaction
-from app.repositories.categories_repo import CategoriesRepo
+from app.services.category_resolver import CategoryResolver
 
 
 class DashboardService:
     def __init__(self, db: Session):
         self.db = db
-        self.cat_repo = CategoriesRepo(db)
 
     def summary(self, user, month: str):
         from_ts, to_ts = month_range_kyiv(month)
+        categories = CategoryResolver(self.db, user.id)
 
         # -------------------------
         # 1) Base totals (UAH)
@@ -118,13 +118,30 @@ class DashboardService:
                 continue
             totals_per_currency[code] = totals_per_currency.get(code, 0) + int(total_cents)
 
+        # -------------------------
+        # 5) Recent (base + original + fx audit)
+        # -------------------------
+        recent_rows = self.db.execute(
+            select(Transaction)
+            .where(
+                Transaction.user_id == user.id,
+                Transaction.occurred_at >= from_ts,
+                Transaction.occurred_at < to_ts,
+            )
+            .order_by(Transaction.occurred_at.desc(), Transaction.id.desc())
+            .limit(10)
+        ).scalars().all()
+
+        # every category shown below, in one query
+        categories.load([r[0] for r in by_cat_orig_rows] + [tx.category_id for tx in recent_rows])
+
         expense_by_category_by_original = []
         for cat_id, cur, total_cents in by_cat_orig_rows:
             code = (cur or "").upper().strip()
             if not code:
                 continue
 
-            cat = self.cat_repo.get_user_category(user.id, cat_id)
+            cat = categories.get(cat_id)
             total_cents_int = int(total_cents)
             denom = totals_per_currency.get(code, 0)
             percent = (total_cents_int / denom * 100.0) if denom > 0 else 0.0
@@ -145,23 +162,9 @@ class DashboardService:
             key=lambda x: (x["currency"], -float(x["total"].replace(",", ".")))
         )
 
-        # -------------------------
-        # 5) Recent (base + original + fx audit)
-        # -------------------------
-        recent_rows = self.db.execute(
-            select(Transaction)
-            .where(
-                Transaction.user_id == user.id,
-                Transaction.occurred_at >= from_ts,
-                Transaction.occurred_at < to_ts,
-            )
-            .order_by(Transaction.occurred_at.desc(), Transaction.id.desc())
-            .limit(10)
-        ).scalars().all()
-
         recent = []
         for tx in recent_rows:
-            cat = self.cat_repo.get_user_category(user.id, tx.category_id)
+            cat = categories.get(tx.category_id)
 
             base_cur = (tx.currency or (user.base_currency or "UAH")).upper()
             orig_cur = (tx.original_currency or base_cur).upper()
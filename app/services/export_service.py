@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Dict, Iterator
+from uuid import UUID
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.core.money import cents_to_amount_str
+from app.models.category import Category
+from app.repositories.transactions_repo import TransactionsRepo
+from app.services.transactions_service import pm_to_str
+
+CSV_COLUMNS = (
+    "id", "occurredAt", "type", "amount", "currency", "originalAmount", "originalCurrency",
+    "fxRateToBase", "fxDate", "categoryId", "category", "paymentMethod", "note", "createdAt",
+)
+
+
+def _category_names(db, user_id) -> Dict[UUID, str]:
+    # archived ones included: old transactions still point at them
+    q = select(Category.id, Category.name).where(Category.user_id == user_id)
+    return dict(db.execute(q).all())
+
+
+def _row_values(row, names: Dict[UUID, str]) -> tuple:
+    return (
+        str(row.id),
+        row.occurred_at.isoformat(),
+        "income" if row.type == 1 else "expense",
+        cents_to_amount_str(row.amount_cents),
+        row.currency,
+        cents_to_amount_str(row.original_amount_cents),
+        row.original_currency,
+        float(row.fx_rate_to_base) if row.fx_rate_to_base is not None else 1.0,
+        row.fx_date.isoformat() if row.fx_date is not None else row.occurred_at.date().isoformat(),
+        str(row.category_id),
+        names.get(row.category_id, "Unknown"),
+        pm_to_str(row.payment_method),
+        row.note,
+        row.created_at.isoformat(),
+    )
+
+
+def _export_batches(user_id, from_ts: datetime | None, to_ts: datetime | None) -> Iterator[tuple[list, Dict[UUID, str]]]:
+    # own session: the request's one is closed before the body is streamed
+    with SessionLocal() as db:
+        names = _category_names(db, user_id)
+        result = TransactionsRepo(db).export_rows(user_id, from_ts, to_ts, settings.export_fetch_rows)
+        for batch in result.partitions():
+            yield batch, names
+
+
+def stream_csv(user_id, from_ts: datetime | None, to_ts: datetime | None) -> Iterator[str]:
+    """One CSV chunk per fetched batch; memory is bounded by export_fetch_rows."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(CSV_COLUMNS)
+    for batch, names in _export_batches(user_id, from_ts, to_ts):
+        writer.writerows(_row_values(row, names) for row in batch)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+
+def stream_ndjson(user_id, from_ts: datetime | None, to_ts: datetime | None) -> Iterator[str]:
+    for batch, names in _export_batches(user_id, from_ts, to_ts):
+        yield "".join(
+            json.dumps(dict(zip(CSV_COLUMNS, _row_values(row, names))), ensure_ascii=False, separators=(",", ":")) + "\n"
+            for row in batch
+        )
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Protocol, Sequence
+
+import httpx
+
+from app.core.circuit_breaker import CLOSED, CircuitBreaker
+from app.core.metrics import LatencyRecorder
+
+logger = logging.getLogger(__name__)
+
+NBU_EXCHANGE_URL = "https://bank.gov.ua/NBUStatService/v1/statdirectory/exchange"
+
+
+class NbuEmptyTable(ValueError):
+    """NBU answered, but has no rates for the date (weekend/holiday/not yet published)."""
+
+
+class FxUpstreamError(RuntimeError):
+    """No provider produced a day table (all failed, timed out or have an open circuit)."""
+
+
+class FxProvider(Protocol):
+    """
+    Source of NBU-style day tables: currency -> UAH per 1 unit, always including UAH=1.0.
+    Raises NbuEmptyTable when the source has no table for the date; any other exception
+    is treated as a provider failure.
+    """
+
+    name: str
+
+    async def fetch_day(self, d: date) -> Dict[str, float]:
+        ...
+
+
+def parse_nbu_table(data: Any) -> Dict[str, float]:
+    # NBU returns list of {cc: 'USD', rate: 40.1234, ...}
+    if not isinstance(data, list):
+        raise ValueError("Unexpected NBU response shape")
+
+    m: Dict[str, float] = {"UAH": 1.0}
+    for row in data:
+        if not isinstance(row, dict):
+            continue
+        cc = (row.get("cc") or "").upper().strip()
+        rate = row.get("rate")
+        if not cc or rate is None:
+            continue
+        try:
+            m[cc] = float(rate)
+        except (TypeError, ValueError):
+            continue
+
+    # sanity: should have at least UAH + some majors
+    if len(m) < 2:
+        raise NbuEmptyTable("NBU table is empty")
+    return m
+
+
+class NbuProvider:
+    """NBU statdirectory/exchange endpoint (or a mirror with the same API)."""
+
+    def __init__(self, name: str, url: str, get_client: Callable[[], httpx.AsyncClient]) -> None:
+        self.name = name
+        self.url = url
+        self._get_client = get_client
+
+    async def fetch_day(self, d: date) -> Dict[str, float]:
+        r = await self._get_client().get(f'{self.url}?date={d.strftime("%Y%m%d")}&json')
+        r.raise_for_status()
+        return parse_nbu_table(r.json())
+
+
+class _ProviderSlot:
+    def __init__(self, provider: FxProvider, breaker: CircuitBreaker) -> None:
+        self.provider = provider
+        self.breaker = breaker
+        self.latency = LatencyRecorder()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"name": self.provider.name, "breaker": self.breaker.stats(), "latency": self.latency.snapshot()}
+
+
+class HedgedFxFetcher:
+    """
+    Fetches a day table from an ordered list of providers within a latency budget.
+    The first provider with a closed circuit gets the request; if it has not answered
+    after its p95 latency (or failed), one hedged request goes to the next available
+    provider (or the same one again when it is the only one) and the first answer wins.
+    NbuEmptyTable is a valid answer and is returned as is.
+    """
+
+    def __init__(
+        self,
+        providers: Sequence[FxProvider],
+        *,
+        budget_seconds: float = 4.0,
+        hedge_min_delay_seconds: float = 0.15,
+        hedge_default_delay_seconds: float = 1.0,
+        hedge_min_samples: int = 20,
+        breaker_failure_threshold: int = 5,
+        breaker_reset_seconds: float = 30.0,
+    ) -> None:
+        if not providers:
+            raise ValueError("At least one FX provider is required")
+        self._slots: List[_ProviderSlot] = [
+            _ProviderSlot(p, CircuitBreaker(breaker_failure_threshold, breaker_reset_seconds)) for p in providers
+        ]
+        self.budget_seconds = budget_seconds
+        self.hedge_min_delay_seconds = hedge_min_delay_seconds
+        self.hedge_default_delay_seconds = hedge_default_delay_seconds
+        self.hedge_min_samples = hedge_min_samples
+
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.timeouts = 0
+
+    def _hedge_delay(self, slot: _ProviderSlot) -> float:
+        delay = self.hedge_default_delay_seconds
+        if slot.latency.count >= self.hedge_min_samples:
+            delay = slot.latency.percentile(95) / 1000
+        return min(max(delay, self.hedge_min_delay_seconds), self.budget_seconds / 2)
+
+    def _pick(self, exclude: Optional[_ProviderSlot] = None) -> Optional[_ProviderSlot]:
+        for slot in self._slots:
+            if slot is not exclude and slot.breaker.allow():
+                return slot
+        # single healthy provider: hedge against itself
+        if exclude is not None and exclude.breaker.state == CLOSED:
+            return exclude
+        return None
+
+    async def _call(self, slot: _ProviderSlot, d: date) -> Dict[str, float]:
+        started = time.perf_counter()
+        try:
+            table = await slot.provider.fetch_day(d)
+        except NbuEmptyTable:
+            self._record(slot, started, ok=True)
+            raise
+        except asyncio.CancelledError:
+            # lost the race or ran out of budget: no verdict on the provider
+            slot.breaker.release()
+            raise
+        except Exception as e:
+            self._record(slot, started, ok=False)
+            logger.warning("FX provider %s failed for %s: %r", slot.provider.name, d.isoformat(), e)
+            raise
+        self._record(slot, started, ok=True)
+        return table
+
+    @staticmethod
+    def _record(slot: _ProviderSlot, started: float, ok: bool) -> None:
+        slot.latency.record((time.perf_counter() - started) * 1000, ok=ok)
+        if ok:
+            slot.breaker.record_success()
+        else:
+            slot.breaker.record_failure()
+
+    async def fetch_day(self, d: date) -> Dict[str, float]:
+        primary = self._pick()
+        if primary is None:
+            raise FxUpstreamError("All FX providers are unavailable (circuit open)")
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = started + self.budget_seconds
+        hedge_at = started + self._hedge_delay(primary)
+
+        primary_task = asyncio.ensure_future(self._call(primary, d))
+        tasks: Dict[asyncio.Future, _ProviderSlot] = {primary_task: primary}
+        hedged = False
+        last_exc: Optional[BaseException] = None
+        try:
+            while tasks:
+                now = loop.time()
+                wait_until = deadline if hedged else min(hedge_at, deadline)
+                done, _ = await asyncio.wait(tasks, timeout=max(0.0, wait_until - now), return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    tasks.pop(task)
+                    exc = task.exception()
+                    if isinstance(exc, NbuEmptyTable):
+                        raise exc
+                    if exc is None:
+                        if hedged and task is not primary_task:
+                            self.hedge_wins += 1
+                        return task.result()
+                    last_exc = exc
+
+                if loop.time() >= deadline:
+                    break
+                if not hedged and (not tasks or loop.time() >= hedge_at):
+                    # primary is slow or already failed: one more attempt elsewhere
+                    hedged = True
+                    second = self._pick(exclude=primary)
+                    if second is not None:
+                        self.hedges += 1
+                        tasks[asyncio.ensure_future(self._call(second, d))] = second
+
+            if tasks:
+                self.timeouts += 1
+                for slot in tasks.values():
+                    # blowing the budget counts against the provider
+                    slot.breaker.record_failure()
+                raise FxUpstreamError(f"FX providers exceeded {self.budget_seconds:.1f}s budget for {d.isoformat()}")
+            raise FxUpstreamError(f"All FX providers failed for {d.isoformat()}") from last_exc
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "budgetSeconds": self.budget_seconds,
+            "hedges": self.hedges,
+            "hedgeWins": self.hedge_wins,
+            "timeouts": self.timeouts,
+            "providers": [s.stats() for s in self._slots],
+        }
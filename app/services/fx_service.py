@@ -1,13 +1,46 @@
 from __future__ import annotations
 
+import asyncio
+import bisect
+import logging
+import time
 from dataclasses import dataclass
-from datetime import date, datetime, timedelta
-from typing import Dict, Tuple, Optional
+from datetime import date, datetime, time as dt_time, timedelta
+from typing import Callable, Dict, Sequence, Tuple, Optional
+from zoneinfo import ZoneInfo
 
 import httpx
-from httpx import HTTPStatusError, RequestError
-
-NBU_EXCHANGE_URL = "https://bank.gov.ua/NBUStatService/v1/statdirectory/exchange"
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.core.cache import TtlLruCache
+from app.core.config import settings
+from app.core.db import SessionLocal, engine
+from app.core.fx_matrix import FxRateMatrix
+from app.core.fx_shm import SharedFxTable, write_fx_table
+from app.core.metrics import LatencyRecorder
+from app.core.singleflight import SingleFlight
+from app.repositories.fx_rates_repo import FxRatesRepo
+from app.services.fx_providers import (
+    NBU_EXCHANGE_URL,
+    FxProvider,
+    FxUpstreamError,
+    HedgedFxFetcher,
+    NbuEmptyTable,
+    NbuProvider,
+)
+
+logger = logging.getLogger(__name__)
+
+# how many days back the weekend/holiday fallback may go
+FALLBACK_DAYS = 7
+
+# NBU sets the next business day's rates in the afternoon, Kyiv time
+NBU_TZ = ZoneInfo("Europe/Kyiv")
+
+# pg advisory lock key: only the worker holding it polls NBU for the next day's table
+FX_SCHEDULER_LOCK_KEY = 0x46585052  # "FXPR"
 
 
 @dataclass(frozen=True)
@@ -16,125 +49,400 @@ class FxRate:
     quote: str
     rate: float
     as_of: date
+    # served from the most recent cached table because the providers were unavailable
+    stale: bool = False
 
 
 class FxService:
-    def __init__(self) -> None:
-        # cache: (as_of_date, base, quote) -> (rate, expires_at)
-        self.NBU_TABLE_URL = 'https://bank.gov.ua/NBUStatService/v1/statdirectory/exchange'
-        self._cache: Dict[Tuple[date, str, str], Tuple[float, datetime]] = {}
-        # cache for daily NBU table: (as_of_date) -> (uah_per_1_map, resolved_date, expires_at)
-        self._day_cache: Dict[date, Tuple[Dict[str, float], date, datetime]] = {}
-
-    def _cache_get(self, key: Tuple[date, str, str]) -> Optional[float]:
-        val = self._cache.get(key)
-        if not val:
+    def __init__(
+        self,
+        *,
+        timeout_seconds: float = 10.0,
+        connect_timeout_seconds: float = 3.0,
+        max_connections: int = 10,
+        max_keepalive_connections: int = 5,
+        keepalive_expiry_seconds: float = 30.0,
+        session_factory: Optional[Callable[[], Session]] = None,
+        matrix_max_days: int = 4096,
+        matrix_max_bytes: Optional[int] = None,
+        day_cache_max_entries: int = 20000,
+        empty_dates_max_entries: int = 2000,
+        cache_sweep_interval_seconds: float = 60.0,
+        lock_engine: Optional[Engine] = None,
+        scheduler_interval_seconds: float = 300.0,
+        nbu_publish_time: dt_time = dt_time(15, 30),
+        providers: Optional[Sequence[FxProvider]] = None,
+        mirror_urls: Sequence[str] = (),
+        upstream_budget_seconds: float = 4.0,
+        hedge_min_delay_seconds: float = 0.15,
+        hedge_default_delay_seconds: float = 1.0,
+        breaker_failure_threshold: int = 5,
+        breaker_reset_seconds: float = 30.0,
+        stale_max_days: int = 30,
+        shm_path: Optional[str] = None,
+        shm_check_interval_seconds: float = 1.0,
+        shm_max_days: int = 3660,
+    ) -> None:
+        # persistent fx_rates tier shared by all workers; None keeps the service memory-only
+        self._session_factory = session_factory
+        # one pooled keep-alive client per process; opened/closed in the app lifespan
+        self._timeout = httpx.Timeout(timeout_seconds, connect=connect_timeout_seconds)
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry_seconds,
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+        self.fetch_latency = LatencyRecorder()
+
+        # NBU first, then its mirrors; tests/drills pass stand-in providers instead
+        if providers is None:
+            providers = [NbuProvider("nbu", NBU_EXCHANGE_URL, self._get_client)] + [
+                NbuProvider(f"mirror{i}", url, self._get_client) for i, url in enumerate(mirror_urls, 1)
+            ]
+        self._upstream = HedgedFxFetcher(
+            providers,
+            budget_seconds=upstream_budget_seconds,
+            hedge_min_delay_seconds=hedge_min_delay_seconds,
+            hedge_default_delay_seconds=hedge_default_delay_seconds,
+            breaker_failure_threshold=breaker_failure_threshold,
+            breaker_reset_seconds=breaker_reset_seconds,
+        )
+        # how old a cached table may be to stand in while the providers are down
+        self._stale_max_days = stale_max_days
+        self.stale_served = 0
+
+        # optional mmap-backed table shared by all workers on the host; written from fx_rates
+        # by the scheduler leader / prefetch, read lock-free by everyone
+        self._shm = SharedFxTable(shm_path, shm_check_interval_seconds) if shm_path else None
+        self._shm_max_days = shm_max_days
+        self._shm_published_signature: Optional[Tuple[int, Optional[datetime]]] = None
+        # NBU day tables keyed by resolved date, stored as one dense date x currency array;
+        # every rate (single pair or batch) is a cross-rate view over it
+        self._matrix = FxRateMatrix(max_days=matrix_max_days, max_bytes=matrix_max_bytes)
+        # requested date -> resolved_date (bounded LRU + TTL); the table itself lives in _matrix
+        self._day_cache: TtlLruCache[date, date] = TtlLruCache(
+            day_cache_max_entries, sweep_interval_seconds=cache_sweep_interval_seconds
+        )
+        # in-flight day table loads keyed by as_of date
+        self._day_flight: SingleFlight[date, date] = SingleFlight()
+        # in-flight single-date NBU probes, shared by fallbacks of neighbouring dates
+        self._probe_flight: SingleFlight[date, Dict[str, float]] = SingleFlight()
+        # negative cache: dates NBU has no table for
+        self._empty_dates: TtlLruCache[date, bool] = TtlLruCache(
+            empty_dates_max_entries, sweep_interval_seconds=cache_sweep_interval_seconds
+        )
+
+        # background refresh of today's / next business day's tables (see start_scheduler)
+        self._lock_engine = lock_engine
+        self._lock_conn: Optional[Connection] = None
+        self._scheduler_interval = scheduler_interval_seconds
+        self._nbu_publish_time = nbu_publish_time
+        self._scheduler_task: Optional[asyncio.Task] = None
+        self.scheduler_leader = False
+        self.scheduler_ticks = 0
+        self.scheduler_failures = 0
+        self._scheduler_last_tick: Optional[datetime] = None
+
+    async def startup(self) -> None:
+        if self._client is None:
+            self._client = self._new_client()
+
+    async def shutdown(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def start_scheduler(self) -> None:
+        if self._scheduler_task is None:
+            self._scheduler_task = asyncio.create_task(self._scheduler_loop())
+
+    async def stop_scheduler(self) -> None:
+        if self._scheduler_task is not None:
+            self._scheduler_task.cancel()
+            try:
+                await self._scheduler_task
+            except asyncio.CancelledError:
+                pass
+            self._scheduler_task = None
+        await asyncio.to_thread(self._release_lead)
+        self.scheduler_leader = False
+
+    def _new_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(timeout=self._timeout, limits=self._limits, headers={"Accept": "application/json"})
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # lazily created for scripts that use the service outside the app lifespan
+        if self._client is None:
+            self._client = self._new_client()
+        return self._client
+
+    def stats(self) -> dict:
+        return {
+            "upstreamFetch": self.fetch_latency.snapshot(),
+            "upstream": self._upstream.stats(),
+            "staleServed": self.stale_served,
+            "sharedTable": self._shm.stats() if self._shm is not None else None,
+            "dayCache": self._day_cache.stats(),
+            "emptyDates": self._empty_dates.stats(),
+            "matrix": self._matrix.stats(),
+            "dayLoadsInFlight": len(self._day_flight),
+            "scheduler": {
+                "running": self._scheduler_task is not None and not self._scheduler_task.done(),
+                "leader": self.scheduler_leader,
+                "ticks": self.scheduler_ticks,
+                "failures": self.scheduler_failures,
+                "lastTickAt": self._scheduler_last_tick.isoformat() if self._scheduler_last_tick else None,
+            },
+        }
+
+    def _day_cache_get(self, as_of: date) -> Optional[date]:
+        resolved_date = self._day_cache.get(as_of)
+        if resolved_date is None:
             return None
-        rate, expires_at = val
-        if datetime.utcnow() >= expires_at:
-            self._cache.pop(key, None)
+        if resolved_date not in self._matrix:
+            # the table row was evicted from the matrix
+            self._day_cache.pop(as_of)
             return None
-        return rate
+        return resolved_date
 
-    def _cache_set(self, key: Tuple[date, str, str], rate: float, ttl_seconds: int) -> None:
-        self._cache[key] = (rate, datetime.utcnow() + timedelta(seconds=ttl_seconds))
+    def _day_cache_set(self, as_of: date, resolved_date: date, ttl_seconds: int) -> None:
+        self._day_cache.set(as_of, resolved_date, ttl_seconds)
 
-    def _day_cache_get(self, as_of: date) -> Optional[Tuple[Dict[str, float], date]]:
-        val = self._day_cache.get(as_of)
-        if not val:
-            return None
-        rates_map, resolved_date, expires_at = val
-        if datetime.utcnow() >= expires_at:
-            self._day_cache.pop(as_of, None)
-            return None
-        return rates_map, resolved_date
+    def sweep_caches(self) -> None:
+        self._day_cache.sweep()
+        self._empty_dates.sweep()
 
-    def _day_cache_set(self, as_of: date, rates_map: Dict[str, float], resolved_date: date, ttl_seconds: int) -> None:
-        self._day_cache[as_of] = (rates_map, resolved_date, datetime.utcnow() + timedelta(seconds=ttl_seconds))
+    def _is_known_empty(self, d: date) -> bool:
+        return self._empty_dates.get(d) is not None
 
-    @staticmethod
-    def _ymd_compact(d: date) -> str:
-        return d.strftime("%Y%m%d")
+    def _mark_empty(self, d: date) -> None:
+        # past dates never get a table later; today/future may still be published
+        ttl = 60 * 60 * 24 * 90 if d < date.today() else 60 * 10
+        self._empty_dates.set(d, True, ttl)
 
     async def _fetch_nbu_table_for_date(self, d: date) -> Dict[str, float]:
         """
         Returns currency -> UAH per 1 unit for given date.
         Always includes UAH=1.0.
-        Raises on network/HTTP/parse errors.
+        Raises NbuEmptyTable if there is no table for the date, FxUpstreamError if no
+        provider answered within the latency budget.
         """
-
-        url = f'{self.NBU_TABLE_URL}?date={d.strftime("%Y%m%d")}&json'
-        headers = {'Accept': 'application/json'}
+        started = time.perf_counter()
+        ok = False
         try:
-            async with httpx.AsyncClient(timeout=10) as client:
-                r = await client.get(url, headers=headers)
-
-                # Перевіряємо статус ПЕРЕД тим як щось робити з тілом відповіді
-                r.raise_for_status()
-                data = r.json()
-
-        except HTTPStatusError as e:
-            print(f"Сервер повернув помилку {e.response.status_code}: {e.response.text}")
-        except RequestError as e:
-            print(f"Помилка мережі при запиті до {e.request.url}")
-        except ValueError:
-            print("Відповідь прийшла не в форматі JSON")
-
-        # NBU returns list of {cc: 'USD', rate: 40.1234, ...}
-        m: Dict[str, float] = {"UAH": 1.0}
-
-        if not isinstance(data, list):
-            raise ValueError("Unexpected NBU response shape")
-
-        for row in data:
-            if not isinstance(row, dict):
-                continue
-            cc = (row.get("cc") or "").upper().strip()
-            rate = row.get("rate")
-            if not cc:
-                continue
-            if rate is None:
-                continue
-            try:
-                m[cc] = float(rate)
-            except Exception:
-                continue
-
-        # sanity: should have at least UAH + some majors
-        if len(m) < 2:
-            raise ValueError("NBU table is empty")
-
-        return m
-
-    async def _get_uah_per_1_map(self, as_of: date) -> Tuple[Dict[str, float], date]:
+            table = await self._upstream.fetch_day(d)
+            ok = True
+            return table
+        except NbuEmptyTable:
+            ok = True
+            raise
+        finally:
+            ms = (time.perf_counter() - started) * 1000
+            self.fetch_latency.record(ms, ok=ok)
+            logger.debug("NBU fetch date=%s took %.1f ms ok=%s", d.isoformat(), ms, ok)
+
+    async def _resolve_day(self, as_of: date) -> date:
         """
-        Gets cached day table; if missing, fetches.
+        Makes sure the day table for `as_of` is in the matrix; fetches it if missing.
         If requested date has no data (weekend/holiday), falls back to previous days (up to 7).
-        Returns (rates_map, resolved_date) where rates_map includes UAH=1.0.
+        Returns the resolved date, i.e. the matrix row to read (includes UAH=1.0).
         """
         cached = self._day_cache_get(as_of)
         if cached is not None:
             return cached
 
-        last_exc: Optional[Exception] = None
+        shared = self._shm_lookup(as_of)
+        if shared is not None:
+            return shared
 
-        # try requested day and go back up to 7 days
-        for back in range(0, 8):
-            d = as_of - timedelta(days=back)
-            try:
-                rates_map = await self._fetch_nbu_table_for_date(d)
+        # concurrent misses for the same date share one fetch chain
+        return await self._day_flight.do(as_of, lambda: self._load_day(as_of))
 
-                # ttl: short for today, long for historical
-                ttl = 60 * 30 if d == date.today() else 60 * 60 * 24 * 90
+    def _shm_lookup(self, as_of: date) -> Optional[date]:
+        if self._shm is None:
+            return None
+        try:
+            self._shm.maybe_reload()
+        except Exception:
+            logger.warning("Shared FX table %s unreadable", self._shm.path, exc_info=True)
+            return None
+        hit = self._shm.lookup(as_of)
+        if hit is None:
+            return None
+        resolved_date, rates_map = hit
+        if resolved_date not in self._matrix:
+            self._matrix.put_day(resolved_date, rates_map)
+        self._day_cache_set(as_of, resolved_date, self._ttl_for(resolved_date))
+        return resolved_date
+
+    def _db_signature(self) -> Tuple[int, Optional[datetime]]:
+        with self._session_factory() as db:
+            return FxRatesRepo(db).signature()
+
+    def _write_shared_table(self) -> dict:
+        end = date.today()
+        with self._session_factory() as db:
+            days = FxRatesRepo(db).get_days(end - timedelta(days=self._shm_max_days), end)
+        return write_fx_table(self._shm.path, days)
+
+    async def publish_shared_table(self, force: bool = False) -> Optional[dict]:
+        """
+        Rewrites the shared table from fx_rates (last shm_max_days days) when fx_rates changed
+        since the last publish. Returns the write summary, or None if nothing was written.
+        """
+        if self._shm is None or self._session_factory is None:
+            return None
+        signature = await asyncio.to_thread(self._db_signature)
+        if not force and signature == self._shm_published_signature:
+            return None
+        summary = await asyncio.to_thread(self._write_shared_table)
+        self._shm_published_signature = signature
+        self._shm.maybe_reload(force=True)
+        logger.info("Shared FX table published: %s", summary)
+        return summary
 
-                # cache under requested key but store resolved_date
-                self._day_cache_set(as_of, rates_map, d, ttl)
-                return rates_map, d
-            except Exception as e:
-                last_exc = e
-                continue
+    @staticmethod
+    def _ttl_for(resolved_date: date) -> int:
+        # ttl: short for today, long for historical
+        return 60 * 30 if resolved_date == date.today() else 60 * 60 * 24 * 90
 
-        raise ValueError(f"FX day table not available for {as_of.isoformat()} (fallback failed)") from last_exc
+    @staticmethod
+    def _is_final(as_of: date, resolved_date: date) -> bool:
+        # a table is immutable once its own date is published or the date is in the past;
+        # "today -> yesterday" may still change when today's table appears
+        return resolved_date == as_of or as_of < date.today()
+
+    def _db_get_day(self, d: date) -> Optional[Tuple[Dict[str, float], date]]:
+        with self._session_factory() as db:
+            return FxRatesRepo(db).get_day(d)
+
+    def _db_get_days(self, start: date, end: date) -> Dict[date, Tuple[Dict[str, float], date]]:
+        with self._session_factory() as db:
+            return FxRatesRepo(db).get_days(start, end)
+
+    def _db_latest_day(self, d: date, since: date) -> Optional[Tuple[Dict[str, float], date]]:
+        with self._session_factory() as db:
+            return FxRatesRepo(db).latest_day(d, since)
+
+    def _db_existing_dates(self, start: date, end: date) -> set[date]:
+        with self._session_factory() as db:
+            return FxRatesRepo(db).existing_dates(start, end)
+
+    def _db_put_days(self, days: list[Tuple[date, Dict[str, float], date]]) -> None:
+        with self._session_factory() as db:
+            repo = FxRatesRepo(db)
+            for d, rates_map, resolved_date in days:
+                repo.upsert_day(d, rates_map, resolved_date)
+            db.commit()
+
+    async def _load_persisted(self, as_of: date) -> Optional[Tuple[Dict[str, float], date]]:
+        if self._session_factory is None:
+            return None
+        try:
+            return await asyncio.to_thread(self._db_get_day, as_of)
+        except Exception:
+            logger.warning("fx_rates read failed for %s, falling back to NBU", as_of.isoformat(), exc_info=True)
+            return None
+
+    async def _persist(self, as_of: date, rates_map: Dict[str, float], resolved_date: date) -> None:
+        if self._session_factory is None or not self._is_final(as_of, resolved_date):
+            return
+        days = [(as_of, rates_map, resolved_date)]
+        if resolved_date != as_of:
+            days.append((resolved_date, rates_map, resolved_date))
+        try:
+            await asyncio.to_thread(self._db_put_days, days)
+        except Exception:
+            logger.warning("fx_rates write failed for %s", as_of.isoformat(), exc_info=True)
+
+    async def _load_day(self, as_of: date) -> date:
+        persisted = await self._load_persisted(as_of)
+        if persisted is not None:
+            rates_map, resolved_date = persisted
+            self._matrix.put_day(resolved_date, rates_map)
+            self._day_cache_set(as_of, resolved_date, self._ttl_for(resolved_date))
+            return resolved_date
+
+        # requested day first: the common case costs exactly one request.
+        # Upstream errors propagate: falling back past a date whose table may exist would
+        # persist a wrong resolution (get_rate serves a stale rate instead)
+        rates_map = await self._probe(as_of)
+        if rates_map is not None:
+            return await self._remember(as_of, rates_map, as_of)
+
+        # walk back: reuse known resolutions/empties, probe the unknown dates concurrently
+        candidates: list[Tuple[date, Optional[date]]] = []
+        for back in range(1, FALLBACK_DAYS + 1):
+            d = as_of - timedelta(days=back)
+            cached = self._day_cache_get(d)
+            if cached is not None:
+                candidates.append((d, cached))
+                break
+            if not self._is_known_empty(d):
+                candidates.append((d, None))
+
+        probe_dates = [d for d, cached in candidates if cached is None]
+        results = await asyncio.gather(*(self._probe(d) for d in probe_dates), return_exceptions=True)
+        probed = dict(zip(probe_dates, results))
+
+        # nearest valid date wins
+        for d, cached in candidates:
+            if cached is not None:
+                return await self._remember(as_of, None, cached)
+            res = probed[d]
+            if isinstance(res, BaseException):
+                raise ValueError(f"FX day table not available for {as_of.isoformat()} (fallback failed)") from res
+            if res is not None:
+                return await self._remember(as_of, res, d)
+
+        raise ValueError(f"FX day table not available for {as_of.isoformat()} (fallback failed)")
+
+    async def _probe(self, d: date) -> Optional[Dict[str, float]]:
+        """
+        NBU table for exactly `d`, or None if NBU has none (negatively cached).
+        Other errors propagate and are not cached.
+        """
+        if self._is_known_empty(d):
+            return None
+        try:
+            return await self._probe_flight.do(d, lambda: self._fetch_nbu_table_for_date(d))
+        except NbuEmptyTable:
+            self._mark_empty(d)
+            return None
+
+    async def _remember(self, as_of: date, rates_map: Optional[Dict[str, float]], resolved_date: date) -> date:
+        """
+        Records that `as_of` resolves to `resolved_date`; `rates_map` is the freshly fetched
+        table for resolved_date, or None when it is already in the matrix.
+        """
+        if rates_map is not None:
+            self._matrix.put_day(resolved_date, rates_map)
+        # "today -> yesterday" is provisional until today's table is published
+        ttl = self._ttl_for(resolved_date) if self._is_final(as_of, resolved_date) else 60 * 30
+        # cache under requested key but store resolved_date
+        self._day_cache_set(as_of, resolved_date, ttl)
+        # every known-empty date in the gap resolves the same way (e.g. Sat when Sun -> Fri)
+        d = as_of - timedelta(days=1)
+        while d > resolved_date:
+            if self._is_known_empty(d):
+                self._day_cache_set(d, resolved_date, ttl)
+            d -= timedelta(days=1)
+        if resolved_date != as_of:
+            self._day_cache_set(resolved_date, resolved_date, ttl)
+
+        if self._session_factory is not None and self._is_final(as_of, resolved_date):
+            table = rates_map if rates_map is not None else self._matrix.day_map(resolved_date)
+            if table:
+                await self._persist(as_of, table, resolved_date)
+        return resolved_date
+
+    def _check_currencies(self, resolved_date: date, base: str, quotes: list[str]) -> None:
+        if not self._matrix.has_currency(resolved_date, base):
+            raise ValueError(f"FX rate not available for base currency {base} on {resolved_date.isoformat()}")
+        for quote in quotes:
+            if not self._matrix.has_currency(resolved_date, quote):
+                raise ValueError(f"FX rate not available for quote currency {quote} on {resolved_date.isoformat()}")
 
     async def get_rate(self, base: str, quote: str, as_of: date) -> FxRate:
         base = base.upper().strip()
@@ -143,31 +451,45 @@ class FxService:
         if base == quote:
             return FxRate(base=base, quote=quote, rate=1.0, as_of=as_of)
 
-        key = (as_of, base, quote)
-        cached = self._cache_get(key)
-        if cached is not None:
-            return FxRate(base=base, quote=quote, rate=cached, as_of=as_of)
-
-        rates_map, resolved_date = await self._get_uah_per_1_map(as_of)
-
-        if base not in rates_map:
-            raise ValueError(f"FX rate not available for base currency {base} on {resolved_date.isoformat()}")
-        if quote not in rates_map:
-            raise ValueError(f"FX rate not available for quote currency {quote} on {resolved_date.isoformat()}")
-
-        # rates_map[X] = UAH per 1 X
-        uah_per_1_base = rates_map[base]
-        uah_per_1_quote = rates_map[quote]
-
-        # base -> quote:
-        # (1 base) = uah_per_1_base UAH
-        # (uah_per_1_base UAH) in quote = uah_per_1_base / uah_per_1_quote
-        rate = uah_per_1_base / uah_per_1_quote
-
-        ttl = 60 * 30 if resolved_date == date.today() else 60 * 60 * 24 * 90
-        self._cache_set(key, float(rate), ttl)
-
-        return FxRate(base=base, quote=quote, rate=float(rate), as_of=resolved_date)
+        stale = False
+        try:
+            resolved_date = await self._resolve_day(as_of)
+        except Exception as e:
+            # providers down/slow: a slightly old rate beats failing the write
+            resolved_date = await self._stale_day(as_of)
+            if resolved_date is None:
+                raise
+            stale = True
+            self.stale_served += 1
+            logger.warning("FX table for %s unavailable (%r), serving stale %s", as_of.isoformat(), e, resolved_date.isoformat())
+
+        # matrix row holds UAH per 1 X, so 1 base = uah_per_1_base / uah_per_1_quote quote
+        rate = self._matrix.rate(resolved_date, base, quote)
+        if rate is None:
+            self._check_currencies(resolved_date, base, [quote])
+
+        return FxRate(base=base, quote=quote, rate=rate, as_of=resolved_date, stale=stale)
+
+    async def _stale_day(self, as_of: date) -> Optional[date]:
+        """
+        Most recent table on or before `as_of` (at most stale_max_days old) from memory or
+        fx_rates. Not put into the day cache, so the next call tries the providers again
+        (cheaply, while their circuits are open).
+        """
+        since = as_of - timedelta(days=self._stale_max_days)
+        resolved_date = self._matrix.latest_on_or_before(as_of, since)
+        if resolved_date is not None or self._session_factory is None:
+            return resolved_date
+        try:
+            persisted = await asyncio.to_thread(self._db_latest_day, as_of, since)
+        except Exception:
+            logger.warning("fx_rates stale lookup failed for %s", as_of.isoformat(), exc_info=True)
+            return None
+        if persisted is None:
+            return None
+        rates_map, resolved_date = persisted
+        self._matrix.put_day(resolved_date, rates_map)
+        return resolved_date
 
     async def get_rates(self, base: str, quotes: list[str], as_of: date) -> dict[str, float]:
         """
@@ -181,25 +503,369 @@ class FxService:
         if not quotes:
             return {}
 
-        rates_map, resolved_date = await self._get_uah_per_1_map(as_of)
+        resolved_date = await self._resolve_day(as_of)
+        self._check_currencies(resolved_date, base, [])
 
-        if base not in rates_map:
-            raise ValueError(f"FX rate not available for base currency {base} on {resolved_date.isoformat()}")
+        row = self._matrix.cross_rates([resolved_date], base, quotes)[0]
+        # unknown quotes are skipped (NaN != NaN)
+        return {q: r for q, r in zip(quotes, row) if r == r}
 
-        uah_per_1_base = rates_map[base]
+    async def supports_currency(self, code: str, as_of: date) -> bool:
+        """
+        Whether NBU's table for `as_of` (or the day it resolves to) quotes `code`.
+        Upstream errors propagate, so False always means "unknown currency".
+        """
+        code = (code or "").upper().strip()
+        if code == "UAH":
+            return True
+        resolved_date = await self._resolve_day(as_of)
+        return self._matrix.has_currency(resolved_date, code)
+
+    async def get_rates_to(
+        self,
+        quote: str,
+        bases_by_date: Dict[date, set[str]],
+        concurrency: int = 8,
+    ) -> Dict[date, Tuple[Optional[date], Dict[str, float]]]:
+        """
+        Batch form of get_rate for many (date, base currency) pairs converted into one quote.
+        Every distinct date is resolved once (bounded concurrency) and its rates are read
+        right away, before the matrix row could be evicted by the other dates.
+        Returns as_of -> (resolved_date, {BASE: rate}); resolved_date is None when the date
+        could not be resolved, unknown currencies are left out.
+        """
+        quote = quote.upper().strip()
+        sem = asyncio.Semaphore(max(1, concurrency))
+        out: Dict[date, Tuple[Optional[date], Dict[str, float]]] = {}
+
+        async def resolve(as_of: date, bases: set[str]) -> None:
+            async with sem:
+                try:
+                    resolved_date = await self._resolve_day(as_of)
+                except Exception:
+                    logger.warning("FX day table unavailable for %s", as_of.isoformat(), exc_info=True)
+                    out[as_of] = (None, {})
+                    return
+            rates: Dict[str, float] = {}
+            for base in bases:
+                base = base.upper().strip()
+                rate = 1.0 if base == quote else self._matrix.rate(resolved_date, base, quote)
+                if rate is not None:
+                    rates[base] = rate
+            out[as_of] = (resolved_date, rates)
+
+        await asyncio.gather(*(resolve(d, bases) for d, bases in bases_by_date.items()))
+        return out
 
-        out: dict[str, float] = {}
-        for q in quotes:
-            if q not in rates_map:
-                continue
-            uah_per_1_quote = rates_map[q]
-            out[q] = float(uah_per_1_base / uah_per_1_quote)
+    @staticmethod
+    def _previous_business_day(d: date) -> date:
+        # Sat -> Fri, Sun -> Fri; weekdays map to themselves
+        return d - timedelta(days=max(0, d.weekday() - 4))
+
+    async def get_timeseries(
+        self,
+        base: str,
+        quotes: list[str],
+        start: date,
+        end: date,
+        concurrency: int = 4,
+    ) -> Tuple[list[date], Dict[str, list[Optional[float]]]]:
+        """
+        Daily rates (1 base = rate quote) for every calendar date in [start, end], as columns.
+        Dates missing from memory come from fx_rates in one read, the rest from NBU via
+        prefetch_range. Weekends/holidays carry the previous business day's rate; dates
+        that could not be resolved (or unknown currencies) are None.
+        """
+        base = base.upper().strip()
+        quotes = [(q or "").upper().strip() for q in quotes]
+        end = min(end, date.today())
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
 
-        ttl = 60 * 30 if resolved_date == date.today() else 60 * 60 * 24 * 90
-        for q, r in out.items():
-            self._cache_set((resolved_date, base, q), float(r), ttl)
+        missing = [d for d in days if self._day_cache_get(d) is None]
+        if missing and self._session_factory is not None:
+            try:
+                persisted = await asyncio.to_thread(self._db_get_days, missing[0], missing[-1])
+            except Exception:
+                logger.warning("fx_rates range read failed, using NBU", exc_info=True)
+                persisted = {}
+            for d, (rates_map, resolved_date) in persisted.items():
+                if resolved_date not in self._matrix:
+                    self._matrix.put_day(resolved_date, rates_map)
+                self._day_cache_set(d, resolved_date, self._ttl_for(resolved_date))
+            missing = [d for d in missing if d not in persisted]
+        if missing:
+            await self.prefetch_range(missing[0], missing[-1], concurrency=concurrency)
+
+        resolved = [self._day_cache_get(d) for d in days]
+        tables = sorted({r for r in resolved if r is not None})
+        rows = dict(zip(tables, self._matrix.cross_rates(tables, base, quotes)))
+
+        columns: Dict[str, list[Optional[float]]] = {q: [] for q in quotes}
+        for r in resolved:
+            row = rows.get(r) if r is not None else None
+            for j, q in enumerate(quotes):
+                v = row[j] if row is not None else None
+                columns[q].append(1.0 if q == base and row is not None else (v if v == v else None))
+        return days, columns
 
-        return out
+    @staticmethod
+    def _next_business_day(d: date) -> date:
+        d += timedelta(days=1)
+        while d.weekday() >= 5:
+            d += timedelta(days=1)
+        return d
+
+    async def _scheduler_loop(self) -> None:
+        # first tick right away so a fresh worker serves today from memory
+        while True:
+            try:
+                await self._scheduler_tick()
+            except Exception:
+                self.scheduler_failures += 1
+                logger.warning("FX scheduler tick failed", exc_info=True)
+            await asyncio.sleep(self._scheduler_interval)
+
+    async def _scheduler_tick(self) -> None:
+        """
+        Keeps today's table resolvable from memory and picks up the next business day's
+        table once NBU has published it. Every worker warms today (fx_rates first, NBU only
+        if no other worker stored it yet); only the advisory-lock holder polls NBU for the
+        next day, the others take it from fx_rates.
+        """
+        self.sweep_caches()
+        try:
+            leader = await asyncio.to_thread(self._try_lead)
+        except Exception:
+            logger.warning("FX scheduler lock check failed", exc_info=True)
+            leader = False
+        self.scheduler_leader = leader
+
+        today = date.today()
+        await self._warm_today(today)
 
+        now_kyiv = datetime.now(NBU_TZ)
+        if now_kyiv.time() >= self._nbu_publish_time:
+            await self._warm_published_day(self._next_business_day(today), fetch=leader)
+
+        if leader and self._shm is not None:
+            try:
+                await self.publish_shared_table()
+            except Exception:
+                logger.warning("Shared FX table publish failed", exc_info=True)
+
+        self.scheduler_ticks += 1
+        self._scheduler_last_tick = datetime.utcnow()
+
+    async def _warm_today(self, today: date) -> None:
+        resolved_date = self._day_cache_get(today)
+        if resolved_date is not None and self._is_final(today, resolved_date):
+            # a published table never changes; renew the index entry before it expires
+            self._day_cache_set(today, resolved_date, self._ttl_for(resolved_date))
+            return
+        if resolved_date is None and self._shm_lookup(today) is not None:
+            # another worker already published it to the shared table (final entries only)
+            return
+        # not cached yet, or still provisional (today -> yesterday): regular path with fallback
+        await self._day_flight.do(today, lambda: self._load_day(today))
+
+    async def _warm_published_day(self, d: date, *, fetch: bool) -> bool:
+        """
+        Loads the table published for exactly `d` (no fallback to earlier days).
+        With fetch=False only fx_rates is consulted. Returns whether the table is in memory.
+        """
+        resolved_date = self._day_cache_get(d)
+        if resolved_date == d:
+            self._day_cache_set(d, d, self._ttl_for(d))
+            return True
+
+        persisted = await self._load_persisted(d)
+        if persisted is not None and persisted[1] == d:
+            self._matrix.put_day(d, persisted[0])
+            self._day_cache_set(d, d, self._ttl_for(d))
+            return True
+        if not fetch:
+            return False
+
+        # not published yet -> None, negatively cached for a few minutes
+        rates_map = await self._probe(d)
+        if rates_map is None:
+            return False
+        await self._remember(d, rates_map, d)
+        logger.info("FX table for %s published, cached ahead of time", d.isoformat())
+        return True
+
+    def _try_lead(self) -> bool:
+        """
+        Session-level pg advisory lock held on a dedicated connection for as long as this
+        worker lives; if the worker dies the server drops the lock with the connection.
+        """
+        if self._lock_engine is None:
+            return True
+        if self._lock_conn is not None:
+            try:
+                self._lock_conn.execute(text("SELECT 1"))
+                return True
+            except Exception:
+                # connection lost, and the lock with it
+                self._release_lead()
 
-fx_service_singleton = FxService()
+        conn = self._lock_engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+        try:
+            acquired = conn.execute(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": FX_SCHEDULER_LOCK_KEY}
+            ).scalar()
+        except Exception:
+            conn.close()
+            raise
+        if acquired:
+            self._lock_conn = conn
+            return True
+        conn.close()
+        return False
+
+    def _release_lead(self) -> None:
+        conn, self._lock_conn = self._lock_conn, None
+        if conn is None:
+            return
+        # closing the DBAPI connection (instead of returning it to the pool) releases the lock
+        try:
+            conn.invalidate()
+        finally:
+            conn.close()
+
+    async def prefetch_range(self, start: date, end: date, concurrency: int = 4) -> dict:
+        """
+        Warms the day cache and the fx_rates tier for every date in [start, end].
+        Dates already cached are skipped. Only business days hit NBU (with bounded
+        concurrency); weekends resolve to the previous business day and holidays to the
+        nearest earlier fetched table, so no fallback probes are needed. Dates at or after
+        a business day whose fetch failed (up to the next fetched table) are left
+        unresolved and reported in failedDates; a rerun fills them in.
+        """
+        started = time.perf_counter()
+        end = min(end, date.today())
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+        persisted: set[date] = set()
+        if self._session_factory is not None and days:
+            try:
+                persisted = await asyncio.to_thread(self._db_existing_dates, start, end)
+            except Exception:
+                logger.warning("fx_rates lookup failed, prefetching the whole range", exc_info=True)
+        missing = [d for d in days if d not in persisted and self._day_cache_get(d) is None]
+
+        anchors = sorted({self._previous_business_day(d) for d in missing})
+        tables: Dict[date, Dict[str, float]] = {}
+        empty: list[date] = []
+        failed_anchors: list[date] = []
+        sem = asyncio.Semaphore(max(1, concurrency))
+
+        async def fetch(d: date) -> None:
+            async with sem:
+                try:
+                    rates_map = await self._probe(d)
+                except FxUpstreamError as e:
+                    # not "no table": the date may have one, so nothing may resolve past it
+                    logger.warning("NBU fetch failed for %s during prefetch: %s", d.isoformat(), e)
+                    failed_anchors.append(d)
+                    return
+                # None: NBU has no table (holiday); resolved from an earlier table below
+                if rates_map is None:
+                    empty.append(d)
+                else:
+                    tables[d] = rates_map
+
+        await asyncio.gather(*(fetch(d) for d in anchors))
+
+        fetched = sorted(tables)
+        failed_anchors.sort()
+        resolved: Dict[date, Tuple[Dict[str, float], date]] = {d: (tables[d], d) for d in fetched}
+        unresolved: list[date] = []
+        blocked: list[date] = []
+        for d in missing:
+            # nearest earlier business day that actually has a table (covers holidays)
+            anchor = self._previous_business_day(d)
+            i = bisect.bisect_right(fetched, anchor) - 1
+            # a failed fetch between that table and d: d may belong to the failed date
+            j = bisect.bisect_right(failed_anchors, anchor) - 1
+            if j >= 0 and (i < 0 or failed_anchors[j] > fetched[i]):
+                blocked.append(d)
+                continue
+            if i < 0 or (d - fetched[i]).days > 7:
+                unresolved.append(d)
+                continue
+            resolved[d] = (tables[fetched[i]], fetched[i])
+
+        for d in fetched:
+            self._matrix.put_day(d, tables[d])
+        for d, (_, resolved_date) in resolved.items():
+            self._day_cache_set(d, resolved_date, self._ttl_for(resolved_date))
+
+        to_persist = [
+            (d, rates_map, resolved_date)
+            for d, (rates_map, resolved_date) in sorted(resolved.items())
+            if d not in persisted and self._is_final(d, resolved_date)
+        ]
+        if self._session_factory is not None and to_persist:
+            try:
+                await asyncio.to_thread(self._db_put_days, to_persist)
+            except Exception:
+                logger.warning("fx_rates write failed during prefetch", exc_info=True)
+            else:
+                try:
+                    await self.publish_shared_table()
+                except Exception:
+                    logger.warning("Shared FX table publish failed after prefetch", exc_info=True)
+
+        # leading holidays with no earlier table in range: regular path with fallback
+        failed_dates = list(blocked)
+        for d in unresolved:
+            try:
+                await self._resolve_day(d)
+            except Exception:
+                failed_dates.append(d)
+
+        seconds = time.perf_counter() - started
+        warmed = len(missing) - len(failed_dates)
+        return {
+            "from": start.isoformat(),
+            "to": end.isoformat(),
+            "days": len(days),
+            "skipped": len(days) - len(missing),
+            "warmed": warmed,
+            "upstreamRequests": len(anchors),
+            "emptyBusinessDays": len(empty),
+            "upstreamFailures": len(failed_anchors),
+            "failed": len(failed_dates),
+            "failedDates": [d.isoformat() for d in sorted(failed_dates)],
+            "seconds": round(seconds, 3),
+            "daysPerSecond": round(warmed / seconds, 1) if seconds > 0 else None,
+        }
+
+
+fx_service_singleton = FxService(
+    timeout_seconds=settings.fx_http_timeout_seconds,
+    connect_timeout_seconds=settings.fx_http_connect_timeout_seconds,
+    max_connections=settings.fx_http_max_connections,
+    max_keepalive_connections=settings.fx_http_max_keepalive_connections,
+    keepalive_expiry_seconds=settings.fx_http_keepalive_expiry_seconds,
+    session_factory=SessionLocal,
+    matrix_max_days=settings.fx_matrix_max_days,
+    matrix_max_bytes=settings.fx_matrix_max_bytes,
+    day_cache_max_entries=settings.fx_day_cache_max_entries,
+    empty_dates_max_entries=settings.fx_empty_dates_max_entries,
+    cache_sweep_interval_seconds=settings.fx_cache_sweep_interval_seconds,
+    lock_engine=engine,
+    scheduler_interval_seconds=settings.fx_scheduler_interval_seconds,
+    nbu_publish_time=dt_time.fromisoformat(settings.fx_nbu_publish_time),
+    mirror_urls=[x.strip() for x in settings.fx_mirror_urls.split(",") if x.strip()],
+    upstream_budget_seconds=settings.fx_upstream_budget_seconds,
+    hedge_min_delay_seconds=settings.fx_hedge_min_delay_seconds,
+    hedge_default_delay_seconds=settings.fx_hedge_default_delay_seconds,
+    breaker_failure_threshold=settings.fx_breaker_failure_threshold,
+    breaker_reset_seconds=settings.fx_breaker_reset_seconds,
+    stale_max_days=settings.fx_stale_max_days,
+    shm_path=settings.fx_shm_path,
+    shm_check_interval_seconds=settings.fx_shm_check_interval_seconds,
+    shm_max_days=settings.fx_shm_max_days,
+)
@@ -0,0 +1,374 @@
+from __future__ import annotations
+
+import asyncio
+import csv
+import logging
+import os
+import tempfile
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from typing import Dict, Iterable, Iterator, Optional, Tuple, Union
+from uuid import UUID
+
+from fastapi import BackgroundTasks, UploadFile
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.core.errors import AppError
+from app.core.fx import RATE_SCALE, decimal_to_cents, money_str_to_decimal
+from app.core.time import date_to_safe_noon, tzinfo
+from app.models.category import Category
+from app.models.job import Job
+from app.repositories.categories_repo import CategoriesRepo
+from app.repositories.jobs_repo import JobsRepo
+from app.repositories.transactions_repo import TransactionsRepo
+from app.services.transactions_service import TransactionsService, _normalize_ccy, import_client_ref_prefix
+
+logger = logging.getLogger(__name__)
+
+JOB_KIND_IMPORT_CSV = "import_csv"
+SOURCE_IMPORT_CSV = 1
+# errors kept on the job row; the rest are only counted
+MAX_JOB_ERRORS = 100
+
+# header name (lower-cased) -> field
+COLUMN_ALIASES = {
+    "date": "date", "occurredat": "date", "occurred_at": "date", "datetime": "date", "дата": "date",
+    "amount": "amount", "sum": "amount", "сума": "amount",
+    "currency": "currency", "валюта": "currency",
+    "category": "category", "категорія": "category",
+    "note": "note", "description": "note", "details": "note", "опис": "note",
+    "type": "type",
+}
+TYPE_ALIASES = {"expense": 0, "income": 1}
+DATE_FORMATS = ("%Y-%m-%d", "%d.%m.%Y", "%d/%m/%Y")
+DATETIME_FORMATS = ("%d.%m.%Y %H:%M:%S", "%d.%m.%Y %H:%M", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M")
+
+
+@dataclass(frozen=True)
+class CsvImportOptions:
+    currency: Optional[str]  # used when the file has no currency column; default = base currency
+    payment_method: int
+    default_expense_category_id: Optional[UUID]
+    default_income_category_id: Optional[UUID]
+
+
+@dataclass(slots=True)
+class ImportRow:
+    line: int
+    type: int
+    original_amount_cents: int
+    currency: str
+    occurred_at: datetime
+    category_id: UUID
+    note: Optional[str]
+
+
+@dataclass(slots=True)
+class ImportRowError:
+    line: int
+    code: str
+    message: str
+
+
+ParsedRow = Union[ImportRow, ImportRowError]
+
+
+# ---- pipeline stages (generators, one row in memory at a time) ----
+
+def read_csv_rows(path: str) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """(line number, {field: raw value}) for every non-empty data row of the file."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        sample = f.read(8192)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        reader = csv.reader(f, dialect)
+        header = next(reader, None)
+        if header is None:
+            return
+        cols: Dict[str, int] = {}
+        for idx, name in enumerate(header):
+            field = COLUMN_ALIASES.get(name.strip().lower())
+            if field and field not in cols:
+                cols[field] = idx
+        if "date" not in cols or "amount" not in cols:
+            raise ValueError("CSV header must contain date and amount columns")
+
+        for rec in reader:
+            if not any(x.strip() for x in rec):
+                continue
+            yield reader.line_num, {field: (rec[idx].strip() if idx < len(rec) else "") for field, idx in cols.items()}
+
+
+def _parse_occurred_at(s: str) -> datetime:
+    try:
+        if "T" in s or "+" in s[10:]:
+            dt = datetime.fromisoformat(s.replace("Z", "+00:00"))
+            return dt if dt.tzinfo else dt.replace(tzinfo=tzinfo())
+    except ValueError:
+        pass
+    for fmt in DATETIME_FORMATS:
+        try:
+            return datetime.strptime(s, fmt).replace(tzinfo=tzinfo())
+        except ValueError:
+            continue
+    for fmt in DATE_FORMATS:
+        try:
+            return date_to_safe_noon(datetime.strptime(s, fmt).date())
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognized date {s!r}")
+
+
+def _parse_amount(s: str) -> Decimal:
+    # bank exports use "1 234,50" / "-1234.50"
+    return money_str_to_decimal(s.replace(" ", "").replace(" ", ""))
+
+
+def parse_rows(
+    rows: Iterable[Tuple[int, Dict[str, str]]],
+    categories: Dict[Tuple[int, str], UUID],
+    options: CsvImportOptions,
+    base_currency: str,
+) -> Iterator[ParsedRow]:
+    defaults = {0: options.default_expense_category_id, 1: options.default_income_category_id}
+    for line, raw in rows:
+        try:
+            amount = _parse_amount(raw["amount"])
+        except (InvalidOperation, ValueError):
+            yield ImportRowError(line, "VALIDATION_ERROR", f"Invalid amount {raw['amount']!r}")
+            continue
+        if not amount.is_finite() or amount == 0:
+            yield ImportRowError(line, "VALIDATION_ERROR", f"Invalid amount {raw['amount']!r}")
+            continue
+
+        try:
+            occurred_at = _parse_occurred_at(raw["date"])
+        except ValueError as e:
+            yield ImportRowError(line, "VALIDATION_ERROR", str(e))
+            continue
+
+        type_str = raw.get("type", "").lower()
+        if type_str:
+            type_int = TYPE_ALIASES.get(type_str)
+            if type_int is None:
+                yield ImportRowError(line, "VALIDATION_ERROR", f"Invalid type {raw['type']!r}")
+                continue
+        else:
+            # statement convention: money out is negative
+            type_int = 0 if amount < 0 else 1
+
+        category_id = categories.get((type_int, raw.get("category", "").lower())) or defaults[type_int]
+        if category_id is None:
+            yield ImportRowError(line, "CATEGORY_NOT_FOUND", f"Unknown category {raw.get('category', '')!r}")
+            continue
+
+        currency = _normalize_ccy(raw.get("currency") or options.currency or base_currency)
+        if len(currency) != 3:
+            yield ImportRowError(line, "VALIDATION_ERROR", f"Invalid currency {currency!r}")
+            continue
+
+        note = raw.get("note") or None
+        yield ImportRow(
+            line=line,
+            type=type_int,
+            original_amount_cents=decimal_to_cents(abs(amount)),
+            currency=currency,
+            occurred_at=occurred_at,
+            category_id=category_id,
+            note=note[:500] if note else None,
+        )
+
+
+def _take(it: Iterator[ParsedRow], n: int) -> list[ParsedRow]:
+    return list(islice(it, n))
+
+
+# ---- job ----
+
+class CsvImportService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.jobs_repo = JobsRepo(db)
+        self.cat_repo = CategoriesRepo(db)
+
+    def _check_default_category(self, user_id, category_id: Optional[UUID], type_int: int) -> None:
+        if category_id is None:
+            return
+        cat = self.cat_repo.get_user_category(user_id, category_id)
+        if not cat or cat.type != type_int:
+            raise AppError("VALIDATION_ERROR", "Invalid default category", status_code=400)
+
+    async def start(
+        self,
+        *,
+        user,
+        upload: UploadFile,
+        options: CsvImportOptions,
+        background_tasks: BackgroundTasks,
+    ) -> Job:
+        """
+        Saves the upload to a temp file (the request's copy is gone once it returns), records a
+        queued job and schedules the import; progress is on the job row.
+        """
+        self._check_default_category(user.id, options.default_expense_category_id, 0)
+        self._check_default_category(user.id, options.default_income_category_id, 1)
+
+        path = await asyncio.to_thread(_save_upload, upload, settings.import_max_bytes)
+
+        now = datetime.utcnow()
+        job = self.jobs_repo.create(
+            Job(user_id=user.id, kind=JOB_KIND_IMPORT_CSV, status="queued", errors=[], created_at=now, updated_at=now)
+        )
+        self.db.commit()
+
+        background_tasks.add_task(run_csv_import, job.id, user.id, _normalize_ccy(user.base_currency), path, options)
+        return job
+
+
+def _save_upload(upload: UploadFile, max_bytes: int) -> str:
+    fd, path = tempfile.mkstemp(prefix="import-", suffix=".csv")
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            upload.file.seek(0)
+            while True:
+                block = upload.file.read(1024 * 1024)
+                if not block:
+                    break
+                size += len(block)
+                if size > max_bytes:
+                    raise AppError("VALIDATION_ERROR", f"File is larger than {max_bytes} bytes", status_code=413)
+                out.write(block)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path
+
+
+def _load_categories(user_id) -> Dict[Tuple[int, str], UUID]:
+    with SessionLocal() as db:
+        q = select(Category.type, Category.name, Category.id).where(
+            Category.user_id == user_id, Category.is_archived == False  # noqa: E712
+        )
+        return {(t, name.lower()): cid for t, name, cid in db.execute(q).all()}
+
+
+def _update_job(job_id: UUID, fields: dict) -> None:
+    with SessionLocal() as db:
+        JobsRepo(db).update_fields(job_id, fields)
+        db.commit()
+
+
+def _write_chunk(job_id: UUID, rows: list[dict], progress: dict) -> int:
+    # rows and progress commit together, so the counters always match the table;
+    # rows already imported by an earlier run of the job are skipped, not counted
+    with SessionLocal() as db:
+        inserted = TransactionsRepo(db).insert_many(rows, skip_existing_client_refs=True)
+        progress = {**progress, "succeeded": progress["succeeded"] + inserted}
+        JobsRepo(db).update_fields(job_id, progress)
+        db.commit()
+    return inserted
+
+
+async def run_csv_import(job_id: UUID, user_id: UUID, base_currency: str, path: str, options: CsvImportOptions) -> None:
+    """
+    read_csv_rows -> parse_rows -> per chunk: batch FX lookup per (currency, date) -> one
+    multi-row INSERT + progress update. Parsing runs in a worker thread a chunk at a time,
+    so memory is bounded by the chunk size whatever the file size. Rows get
+    client_ref="imp:<job>:<line>", which makes re-running a job idempotent.
+    """
+    chunk_rows = settings.import_chunk_rows
+    ref_prefix = import_client_ref_prefix(job_id)
+    counters = {"processed": 0, "succeeded": 0, "failed": 0}
+    errors: list[dict] = []
+
+    def fail(line: int, code: str, message: str) -> None:
+        counters["failed"] += 1
+        if len(errors) < MAX_JOB_ERRORS:
+            errors.append({"row": line, "code": code, "message": message})
+
+    try:
+        await asyncio.to_thread(_update_job, job_id, {"status": "running"})
+        categories = await asyncio.to_thread(_load_categories, user_id)
+        parsed = parse_rows(read_csv_rows(path), categories, options, base_currency)
+
+        while True:
+            chunk = await asyncio.to_thread(_take, parsed, chunk_rows)
+            if not chunk:
+                break
+
+            good: list[ImportRow] = []
+            for r in chunk:
+                if isinstance(r, ImportRowError):
+                    fail(r.line, r.code, r.message)
+                else:
+                    good.append(r)
+
+            rates = await TransactionsService._rates_for_pairs(
+                base_currency, {(r.currency, r.occurred_at.date()) for r in good if r.currency != base_currency}
+            )
+
+            now = datetime.utcnow()
+            rows: list[dict] = []
+            for r in good:
+                fx_date: date = r.occurred_at.date()
+                rate_scaled = RATE_SCALE if r.currency == base_currency else rates[(r.currency, fx_date)]
+                if isinstance(rate_scaled, Exception):
+                    fail(r.line, "FX_UNAVAILABLE", str(rate_scaled))
+                    continue
+                fx_fields = TransactionsService._fx_fields_for_cents(
+                    base=base_currency,
+                    original_amount_cents=r.original_amount_cents,
+                    original_currency=r.currency,
+                    rate_scaled=rate_scaled,
+                    fx_date=fx_date,
+                )
+                rows.append({
+                    "id": uuid.uuid4(),
+                    "user_id": user_id,
+                    "type": r.type,
+                    "occurred_at": r.occurred_at,
+                    "category_id": r.category_id,
+                    "payment_method": options.payment_method,
+                    "note": r.note,
+                    "client_ref": f"{ref_prefix}{r.line}",
+                    "source": SOURCE_IMPORT_CSV,
+                    "created_at": now,
+                    "updated_at": now,
+                    **fx_fields,
+                })
+
+            counters["processed"] += len(chunk)
+            counters["succeeded"] += await asyncio.to_thread(_write_chunk, job_id, rows, {**counters, "errors": list(errors)})
+
+        await asyncio.to_thread(_update_job, job_id, {
+            "status": "done",
+            "total": counters["processed"],
+            "errors": errors,
+            "finished_at": datetime.utcnow(),
+        })
+    except Exception as e:
+        logger.exception("CSV import job %s failed", job_id)
+        try:
+            await asyncio.to_thread(_update_job, job_id, {
+                "status": "failed",
+                "message": str(e)[:1000],
+                "errors": errors,
+                "finished_at": datetime.utcnow(),
+            })
+        except Exception:
+            logger.exception("Could not mark import job %s as failed", job_id)
+    finally:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
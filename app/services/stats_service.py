@@ -7,7 +7,7 @@ from sqlalchemy import select, func, case
 
 from app.core.money import cents_to_amount_str
 from app.models.transaction import Transaction
-from app.repositories.categories_repo import CategoriesRepo
+from app.services.category_resolver import CategoryResolver
 
 
 def _day_range_kyiv(d: date):
@@ -24,7 +24,6 @@ def _day_range_kyiv(d: date):
 class StatsService:
     def __init__(self, db: Session):
         self.db = db
-        self.cat_repo = CategoriesRepo(db)
 
     def summary(self, user, from_date: date, to_date: date):
         # inclusive day range -> [from_ts, to_ts_exclusive)
@@ -100,11 +99,33 @@ class StatsService:
             .group_by(Transaction.category_id)
         ).all()
 
+        # -------------------------
+        # 4) expenses by category + original currency (no conversion)
+        # -------------------------
+        by_cat_orig_rows = self.db.execute(
+            select(
+                Transaction.category_id,
+                Transaction.original_currency,
+                func.coalesce(func.sum(Transaction.original_amount_cents), 0).label("total"),
+            )
+            .where(
+                Transaction.user_id == user.id,
+                Transaction.type == 0,
+                Transaction.occurred_at >= from_ts,
+                Transaction.occurred_at < to_ts_exclusive,
+            )
+            .group_by(Transaction.category_id, Transaction.original_currency)
+        ).all()
+
+        # every category of both breakdowns, in one query
+        categories = CategoryResolver(self.db, user.id)
+        categories.load([r[0] for r in by_cat_rows] + [r[0] for r in by_cat_orig_rows])
+
         total_expense_base = sum(int(r[1]) for r in by_cat_rows) if by_cat_rows else 0
 
         by_category = []
         for cat_id, total_cents in by_cat_rows:
-            cat = self.cat_repo.get_user_category(user.id, cat_id)
+            cat = categories.get(cat_id)
             total_cents_int = int(total_cents)
             percent = (total_cents_int / total_expense_base * 100.0) if total_expense_base > 0 else 0.0
             by_category.append(
@@ -119,23 +140,8 @@ class StatsService:
         by_category.sort(key=lambda x: -float(x["total"].replace(",", ".")))
 
         # -------------------------
-        # 4) NEW: expenseByCategoryByOriginal (no conversion)
+        # 5) expenseByCategoryByOriginal
         # -------------------------
-        by_cat_orig_rows = self.db.execute(
-            select(
-                Transaction.category_id,
-                Transaction.original_currency,
-                func.coalesce(func.sum(Transaction.original_amount_cents), 0).label("total"),
-            )
-            .where(
-                Transaction.user_id == user.id,
-                Transaction.type == 0,
-                Transaction.occurred_at >= from_ts,
-                Transaction.occurred_at < to_ts_exclusive,
-            )
-            .group_by(Transaction.category_id, Transaction.original_currency)
-        ).all()
-
         totals_per_currency: dict[str, int] = {}
         for cat_id, cur, total_cents in by_cat_orig_rows:
             code = (cur or "").upper().strip()
@@ -149,7 +155,7 @@ class StatsService:
             if not code:
                 continue
 
-            cat = self.cat_repo.get_user_category(user.id, cat_id)
+            cat = categories.get(cat_id)
             total_cents_int = int(total_cents)
             denom = totals_per_currency.get(code, 0)
             percent = (total_cents_int / denom * 100.0) if denom > 0 else 0.0
@@ -1,18 +1,35 @@
+import asyncio
 import base64
-from datetime import datetime
+import logging
+import uuid
+from datetime import date, datetime, time, timedelta
 from decimal import Decimal
+from typing import Any
 from uuid import UUID
+from fastapi import BackgroundTasks
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 from app.core.errors import AppError
-from app.core.fx import convert_original_to_base_cents, money_str_to_cents, dt_to_fx_date
-from app.schemas.transaction import TransactionCreate
+from app.core.money import cents_to_amount_str
+from app.core.fx import RATE_SCALE, convert_cents, money_str_to_cents, rate_to_scaled, scaled_to_rate, dt_to_fx_date
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.core.time import tzinfo
+from app.schemas.transaction import TransactionBulkFilter, TransactionBulkUpdate, TransactionCreate
 from app.services.fx_service import fx_service_singleton
 from app.repositories.transactions_repo import TransactionsRepo
 from app.repositories.categories_repo import CategoriesRepo
+from app.repositories.jobs_repo import JobsRepo
+from app.models.job import Job
 from app.models.transaction import Transaction
 
 PM_FROM_STR = {"cash": 0, "card": 1, "transfer": 2, "other": 3}
 TYPE_FROM_STR = {"expense": 0, "income": 1}
+PM_TO_STR = {0: "cash", 1: "card", 2: "transfer", 3: "other"}
+SOURCE_FROM_STR = {"manual": 0, "import_csv": 1}
+JOB_KIND_DELETE = "delete_transactions"
+
+logger = logging.getLogger(__name__)
 
 def tx_type_to_int(t: str) -> int:
     return 0 if t == "expense" else 1
@@ -44,6 +61,66 @@ def decode_cursor(cursor: str):
         raise AppError("VALIDATION_ERROR", "Invalid cursor", status_code=400)
 
 
+def encode_rank_cursor(rank: float, occurred_at: datetime, tx_id) -> str:
+    # repr() round-trips the float exactly, so the keyset comparison is stable
+    raw = f"{occurred_at.isoformat()}|{str(tx_id)}|{rank!r}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("utf-8")
+
+
+def decode_rank_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("utf-8")).decode("utf-8")
+        dt_str, id_str, rank_str = raw.split("|", 2)
+        return float(rank_str), datetime.fromisoformat(dt_str), UUID(id_str)
+    except Exception:
+        raise AppError("VALIDATION_ERROR", "Invalid cursor", status_code=400)
+
+
+def import_client_ref_prefix(job_id) -> str:
+    # rows written by a CSV import job get client_ref = prefix + line number
+    return f"imp:{job_id}:"
+
+
+def _item_error(index: int, code: str, message: str, details: list | None = None) -> dict:
+    return {"index": index, "error": {"code": code, "message": message, "details": details or []}}
+
+
+def _item_validation_error(index: int, exc: ValidationError) -> dict:
+    # same shape as validation_error_handler, per batch item
+    details = []
+    for e in exc.errors():
+        loc = ".".join(str(x) for x in e.get("loc", []))
+        details.append({"field": loc or "item", "issue": e.get("msg", "Invalid")})
+    return _item_error(index, "VALIDATION_ERROR", "Validation failed", details)
+
+
+def _list_item(row) -> dict:
+    # row: TransactionsRepo.LIST_COLUMNS (+ rank); same output as TransactionDto
+    (tx_id, type_int, amount_cents, currency, occurred_at, category_id, payment_method, note,
+     created_at, updated_at, original_amount_cents, original_currency, fx_rate_to_base, fx_date,
+     category_name, category_icon) = row[:16]
+    return {
+        "id": str(tx_id),
+        "type": "income" if type_int == 1 else "expense",
+        "amount": cents_to_amount_str(amount_cents),
+        "currency": currency,
+        "occurredAt": occurred_at.isoformat(),
+        "createdAt": created_at.isoformat(),
+        "updatedAt": updated_at.isoformat(),
+        "paymentMethod": PM_TO_STR.get(payment_method, "other"),
+        "note": note,
+        "category": {
+            "id": str(category_id),
+            "name": category_name if category_name is not None else "Unknown",
+            "icon": category_icon,
+        },
+        "originalAmount": cents_to_amount_str(original_amount_cents),
+        "originalCurrency": original_currency,
+        "fxRateToBase": float(fx_rate_to_base) if fx_rate_to_base is not None else 1.0,
+        "fxDate": fx_date.isoformat() if fx_date is not None else occurred_at.date().isoformat(),
+    }
+
+
 class TransactionsService:
     def __init__(self, db: Session):
         self.db = db
@@ -70,27 +147,76 @@ class TransactionsService:
         fx_date = dt_to_fx_date(occurred_at)
 
         if original_currency == base:
-            rate = Decimal("1")
+            rate_scaled = RATE_SCALE
         else:
             fx = await fx_service_singleton.get_rate(
                 base=original_currency,
                 quote=base,
                 as_of=fx_date,
             )
-            rate = Decimal(str(fx.rate))
+            rate_scaled = rate_to_scaled(fx.rate)
+
+        return self._fx_fields_for_rate(
+            base=base,
+            original_amount=original_amount,
+            original_currency=original_currency,
+            rate_scaled=rate_scaled,
+            fx_date=fx_date,
+        )
 
-        amount_cents_base = convert_original_to_base_cents(original_amount, rate)
-        original_amount_cents = money_str_to_cents(original_amount)
+    @staticmethod
+    def _fx_fields_for_rate(
+        *,
+        base: str,
+        original_amount: str,
+        original_currency: str,
+        rate_scaled: int,
+        fx_date: date,
+    ) -> dict:
+        return TransactionsService._fx_fields_for_cents(
+            base=base,
+            original_amount_cents=money_str_to_cents(original_amount),
+            original_currency=original_currency,
+            rate_scaled=rate_scaled,
+            fx_date=fx_date,
+        )
+
+    @staticmethod
+    def _fx_fields_for_cents(
+        *,
+        base: str,
+        original_amount_cents: int,
+        original_currency: str,
+        rate_scaled: int,
+        fx_date: date,
+    ) -> dict:
+        amount_cents_base = convert_cents(original_amount_cents, rate_scaled)
 
         return {
             "amount_cents": amount_cents_base,
             "currency": base,
             "original_amount_cents": original_amount_cents,
             "original_currency": original_currency,
-            "fx_rate_to_base": rate,
+            "fx_rate_to_base": scaled_to_rate(rate_scaled),
             "fx_date": fx_date,
         }
 
+    @staticmethod
+    async def _rates_for_pairs(base: str, pairs: set) -> dict:
+        """
+        (currency, fx_date) -> scaled rate to `base`, or the exception for that pair.
+        Each distinct pair is looked up once; lookups run concurrently.
+        """
+        pairs = list(pairs)
+        results = await asyncio.gather(
+            *(fx_service_singleton.get_rate(base=ccy, quote=base, as_of=d) for ccy, d in pairs),
+            return_exceptions=True,
+        )
+        return {
+            pair: res if isinstance(res, Exception) else rate_to_scaled(res.rate)
+            for pair, res in zip(pairs, results)
+        }
+
     def _validate_category_matches_type(self, *, user_id: UUID, category_id: UUID, type_int: int) -> None:
         cat = self.cat_repo.get_user_category(user_id, category_id)
         if not cat:
@@ -103,12 +229,23 @@ class TransactionsService:
         *,
         user,
         payload: TransactionCreate,
-    ) -> UUID:
-        # payload is TransactionCreateInput
+    ) -> tuple[UUID, bool]:
+        """
+        Returns (id, created). A retry with an already stored clientRef returns the stored id
+        with created=False, found by the same query that checks the category, so it costs
+        one round trip and no FX lookup. Concurrent first attempts are settled by
+        INSERT ... ON CONFLICT DO NOTHING.
+        """
         type_int = TYPE_FROM_STR[payload.type]
 
         category_id = UUID(payload.categoryId)
-        self._validate_category_matches_type(user_id=user.id, category_id=category_id, type_int=type_int)
+        existing_id, cat_type = self.tx_repo.client_ref_and_category_type(user.id, payload.clientRef, category_id)
+        if existing_id is not None:
+            return existing_id, False
+        if cat_type is None:
+            raise AppError("VALIDATION_ERROR", "Category not found", status_code=400)
+        if cat_type != type_int:
+            raise AppError("VALIDATION_ERROR", "Category type does not match transaction type", status_code=400)
 
         occurred_at = payload.occurredAt
 
@@ -119,28 +256,131 @@ class TransactionsService:
             original_currency=payload.currency or user.base_currency,
         )
 
-        tx = Transaction(
-            user_id=user.id,
-            type=type_int,
-            amount_cents=fx_fields["amount_cents"],
-            currency=fx_fields["currency"],
-            occurred_at=occurred_at,
-            category_id=category_id,
-            payment_method=PM_FROM_STR.get(payload.paymentMethod, 3),
-            note=(payload.note.strip() if payload.note else None),
-            client_ref=payload.clientRef,
-            source=0,  # keep whatever you use; 0 = manual
-            original_amount_cents=fx_fields["original_amount_cents"],
-            original_currency=fx_fields["original_currency"],
-            fx_rate_to_base=fx_fields["fx_rate_to_base"],
-            fx_date=fx_fields["fx_date"],
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow(),
+        now = datetime.utcnow()
+        tx_id, created = self.tx_repo.insert_idempotent({
+            "id": uuid.uuid4(),
+            "user_id": user.id,
+            "type": type_int,
+            "occurred_at": occurred_at,
+            "category_id": category_id,
+            "payment_method": PM_FROM_STR.get(payload.paymentMethod, 3),
+            "note": (payload.note.strip() if payload.note else None),
+            "client_ref": payload.clientRef,
+            "source": 0,  # 0 = manual
+            "created_at": now,
+            "updated_at": now,
+            **fx_fields,
+        })
+        self.db.commit()
+        return tx_id, created
+
+    async def create_batch(self, *, user, items: list[Any]) -> list[dict]:
+        """
+        Creates many transactions in one DB transaction: categories are checked with one
+        query, FX is resolved once per distinct (currency, date) and all valid rows go in one
+        multi-row INSERT. Returns one result per input item, in input order:
+        {"index", "id", "created"} or {"index", "error"}. An item whose clientRef is already
+        stored returns the stored id with created=False.
+        """
+        results: list[dict | None] = [None] * len(items)
+
+        parsed: list[tuple[int, TransactionCreate, UUID]] = []
+        for i, raw in enumerate(items):
+            try:
+                payload = TransactionCreate.model_validate(raw)
+                parsed.append((i, payload, UUID(payload.categoryId)))
+            except ValidationError as e:
+                results[i] = _item_validation_error(i, e)
+            except ValueError:
+                results[i] = _item_error(i, "VALIDATION_ERROR", "Invalid categoryId")
+
+        # clientRef: already stored -> idempotent replay; repeated inside the batch -> error
+        existing = self.tx_repo.ids_by_client_refs(user.id, [p.clientRef for _, p, _ in parsed if p.clientRef])
+        seen_refs: set[str] = set()
+        pending: list[tuple[int, TransactionCreate, UUID]] = []
+        for i, payload, category_id in parsed:
+            ref = payload.clientRef
+            if ref is not None:
+                if ref in existing:
+                    results[i] = {"index": i, "id": str(existing[ref]), "created": False}
+                    continue
+                if ref in seen_refs:
+                    results[i] = _item_error(i, "DUPLICATE_CLIENT_REF", "clientRef repeated in batch")
+                    continue
+                seen_refs.add(ref)
+            pending.append((i, payload, category_id))
+
+        categories = self.cat_repo.map_by_ids(user.id, {category_id for _, _, category_id in pending})
+
+        base = _normalize_ccy(user.base_currency)
+        valid: list[tuple[int, TransactionCreate, UUID, int, str]] = []
+        for i, payload, category_id in pending:
+            type_int = TYPE_FROM_STR[payload.type]
+            cat = categories.get(category_id)
+            if cat is None:
+                results[i] = _item_error(i, "VALIDATION_ERROR", "Category not found")
+            elif cat.type != type_int:
+                results[i] = _item_error(i, "VALIDATION_ERROR", "Category type does not match transaction type")
+            else:
+                valid.append((i, payload, category_id, type_int, _normalize_ccy(payload.currency or base)))
+
+        rates = await self._rates_for_pairs(
+            base, {(ccy, dt_to_fx_date(p.occurredAt)) for _, p, _, _, ccy in valid if ccy != base}
         )
 
-        self.tx_repo.create(tx)
+        now = datetime.utcnow()
+        rows: list[dict] = []
+        for i, payload, category_id, type_int, ccy in valid:
+            fx_date = dt_to_fx_date(payload.occurredAt)
+            rate_scaled = RATE_SCALE if ccy == base else rates[(ccy, fx_date)]
+            if isinstance(rate_scaled, Exception):
+                results[i] = _item_error(i, "FX_UNAVAILABLE", str(rate_scaled))
+                continue
+            try:
+                fx_fields = self._fx_fields_for_rate(
+                    base=base,
+                    original_amount=payload.amount,
+                    original_currency=ccy,
+                    rate_scaled=rate_scaled,
+                    fx_date=fx_date,
+                )
+            except (ArithmeticError, ValueError):
+                results[i] = _item_error(i, "VALIDATION_ERROR", "Invalid amount")
+                continue
+
+            tx_id = uuid.uuid4()
+            rows.append({
+                "id": tx_id,
+                "user_id": user.id,
+                "type": type_int,
+                "amount_cents": fx_fields["amount_cents"],
+                "currency": fx_fields["currency"],
+                "occurred_at": payload.occurredAt,
+                "category_id": category_id,
+                "payment_method": PM_FROM_STR.get(payload.paymentMethod, 3),
+                "note": (payload.note.strip() if payload.note else None),
+                "client_ref": payload.clientRef,
+                "source": 0,
+                "original_amount_cents": fx_fields["original_amount_cents"],
+                "original_currency": fx_fields["original_currency"],
+                "fx_rate_to_base": fx_fields["fx_rate_to_base"],
+                "fx_date": fx_fields["fx_date"],
+                "created_at": now,
+                "updated_at": now,
+            })
+            results[i] = {"index": i, "id": str(tx_id), "created": True}
+
+        inserted = self.tx_repo.insert_many_returning_ids(rows)
+        # rows skipped by ON CONFLICT: a concurrent request stored the same clientRef first
+        lost = {str(r["id"]): r["client_ref"] for r in rows if r["id"] not in inserted}
+        if lost:
+            stored = self.tx_repo.ids_by_client_refs(user.id, lost.values())
+            for res in results:
+                ref = lost.get(res.get("id"))
+                if ref is not None:
+                    res.update(id=str(stored[ref]), created=False)
         self.db.commit()
-        return tx.id
+        return results
 
     async def update(
         self,
@@ -235,36 +475,201 @@ class TransactionsService:
         self.tx_repo.save(tx)
         self.db.commit()
 
+    def _bulk_clauses(self, user, f: TransactionBulkFilter) -> list:
+        if not (f.ids or f.from_ or f.to or f.type or f.categoryId or f.paymentMethod or f.q or f.source or f.importJobId):
+            raise AppError("VALIDATION_ERROR", "At least one filter is required", status_code=400)
+        if f.from_ and f.to and f.from_ > f.to:
+            raise AppError("VALIDATION_ERROR", "from must not be after to", status_code=400)
+
+        from_ts = datetime.combine(f.from_, time.min, tzinfo=tzinfo()) if f.from_ else None
+        to_ts = datetime.combine(f.to + timedelta(days=1), time.min, tzinfo=tzinfo()) if f.to else None
+        return self.tx_repo.filter_clauses(
+            user.id,
+            from_ts=from_ts,
+            to_ts=to_ts,
+            type_int=TYPE_FROM_STR[f.type] if f.type else None,
+            category_id=f.categoryId,
+            payment_method_int=PM_FROM_STR[f.paymentMethod] if f.paymentMethod else None,
+            q_text=f.q,
+            ids=f.ids,
+            source=SOURCE_FROM_STR[f.source] if f.source else None,
+            client_ref_prefix=import_client_ref_prefix(f.importJobId) if f.importJobId else None,
+        )
+
+    async def bulk_update(self, *, user, payload: TransactionBulkUpdate) -> int:
+        """
+        Applies `payload.set` to every transaction matching `payload.filter` and returns the
+        number of rows changed. Category / payment method / note changes are one set-based
+        UPDATE. Changing amount, currency or occurredAt re-runs FX conversion: matched rows
+        are walked in id order, settings.transactions_bulk_chunk_rows at a time, with one FX
+        lookup per distinct (currency, date) and one executemany UPDATE per chunk. Either way
+        it is a single DB transaction.
+        """
+        clauses = self._bulk_clauses(user, payload.filter)
+        upd = payload.set
+
+        fields: dict = {}
+        if upd.categoryId is not None:
+            cat = self.ensure_category(user.id, upd.categoryId)
+            if self.tx_repo.exists_with_other_type(clauses, cat.type):
+                raise AppError("VALIDATION_ERROR", "Category type does not match transaction type", status_code=400)
+            fields["category_id"] = upd.categoryId
+        if upd.paymentMethod is not None:
+            fields["payment_method"] = PM_FROM_STR[upd.paymentMethod]
+        if "note" in upd.model_fields_set:
+            fields["note"] = (upd.note.strip() or None) if upd.note else None
+
+        need_fx = upd.amount is not None or upd.currency is not None or upd.occurredAt is not None
+        if not fields and not need_fx:
+            raise AppError("VALIDATION_ERROR", "Nothing to update", status_code=400)
+        fields["updated_at"] = datetime.utcnow()
+
+        if not need_fx:
+            count = self.tx_repo.bulk_update(clauses, fields)
+            self.db.commit()
+            return count
+
+        new_cents = None
+        if upd.amount is not None:
+            try:
+                new_cents = money_str_to_cents(upd.amount)
+            except (ArithmeticError, ValueError):
+                raise AppError("VALIDATION_ERROR", "Invalid amount", status_code=400)
+
+        base = _normalize_ccy(user.base_currency)
+        # checked before any row is touched: an unknown currency would otherwise only fail
+        # in the FX lookup of the first chunk
+        new_ccy = _normalize_ccy(upd.currency) if upd.currency else None
+        if new_ccy is not None and new_ccy != base:
+            ref_date = dt_to_fx_date(upd.occurredAt) if upd.occurredAt else date.today()
+            try:
+                supported = await fx_service_singleton.supports_currency(new_ccy, ref_date)
+            except Exception:
+                raise AppError("FX_UNAVAILABLE", f"No {new_ccy} rate for {ref_date.isoformat()}", status_code=503)
+            if not supported:
+                raise AppError("VALIDATION_ERROR", f"Unsupported currency {new_ccy}", status_code=400)
+        count = 0
+        after_id = None
+        while True:
+            rows = self.tx_repo.fx_source_rows(clauses, after_id, settings.transactions_bulk_chunk_rows)
+            if not rows:
+                break
+            after_id = rows[-1].id
+
+            targets = []
+            for tx_id, cents, ccy, occurred_at in rows:
+                occurred_at = upd.occurredAt or occurred_at
+                targets.append((
+                    tx_id,
+                    new_cents if new_cents is not None else cents,
+                    new_ccy or ccy,
+                    occurred_at,
+                    dt_to_fx_date(occurred_at),
+                ))
+
+            rates = await self._rates_for_pairs(base, {(ccy, d) for _, _, ccy, _, d in targets if ccy != base})
+
+            values = []
+            for tx_id, cents, ccy, occurred_at, fx_date in targets:
+                rate_scaled = RATE_SCALE if ccy == base else rates[(ccy, fx_date)]
+                if isinstance(rate_scaled, Exception):
+                    raise AppError(
+                        "FX_UNAVAILABLE", f"No {ccy} rate for {fx_date.isoformat()}", status_code=503
+                    )
+                values.append({
+                    "id": tx_id,
+                    **fields,
+                    "occurred_at": occurred_at,
+                    **self._fx_fields_for_cents(
+                        base=base,
+                        original_amount_cents=cents,
+                        original_currency=ccy,
+                        rate_scaled=rate_scaled,
+                        fx_date=fx_date,
+                    ),
+                })
+            self.tx_repo.update_by_ids(values)
+            count += len(values)
+
+        self.db.commit()
+        return count
+
+    def bulk_delete(self, *, user, filters: TransactionBulkFilter, background_tasks: BackgroundTasks) -> dict:
+        """
+        Deletes every transaction matching `filters` in chunks of
+        settings.transactions_delete_chunk_rows, each in its own short transaction.
+        Up to settings.transactions_delete_sync_max rows are deleted before returning
+        ({"deleted": n}); larger deletes become a background job ({"jobId", ...}) whose
+        progress is on GET /jobs/{jobId}.
+        """
+        clauses = self._bulk_clauses(user, filters)
+        _require_narrowed(clauses)
+        total = self.tx_repo.count(clauses)
+
+        if total <= settings.transactions_delete_sync_max:
+            deleted = 0
+            while True:
+                n = self.tx_repo.delete_chunk(clauses, settings.transactions_delete_chunk_rows)
+                self.db.commit()
+                deleted += n
+                if n < settings.transactions_delete_chunk_rows:
+                    break
+            return {"deleted": deleted}
+
+        now = datetime.utcnow()
+        job = JobsRepo(self.db).create(
+            Job(user_id=user.id, kind=JOB_KIND_DELETE, status="queued", total=total, errors=[], created_at=now, updated_at=now)
+        )
+        self.db.commit()
+        background_tasks.add_task(run_bulk_delete, job.id, clauses)
+        return {"jobId": str(job.id), "status": job.status, "total": total}
+
     def delete(self, user, tx_id: UUID):
         count = self.tx_repo.delete(user.id, tx_id)
         if count == 0:
             raise AppError("NOT_FOUND", "Transaction not found", status_code=404)
         self.db.commit()
 
-    def list(self, user, from_ts, to_ts, type_str, category_id, payment_method, q_text, limit, cursor):
+    def list(self, user, from_ts, to_ts, type_str, category_id, payment_method, q_text, limit, cursor, sort="date"):
+        """
+        Returns (items, nextCursor) with items already in the TransactionDto shape.
+        Rows are selected as column tuples (category joined in), not ORM instances.
+        """
         type_int = tx_type_to_int(type_str) if type_str else None
         pm_int = pm_to_int(payment_method) if payment_method else None
-        cursor_dt, cursor_id = decode_cursor(cursor) if cursor else (None, None)
+        q_text = (q_text or "").strip() or None
+        by_relevance = sort == "relevance" and q_text is not None
 
-        items = self.tx_repo.list_cursor(
+        cursor_rank = None
+        if by_relevance and cursor:
+            cursor_rank, cursor_dt, cursor_id = decode_rank_cursor(cursor)
+        else:
+            cursor_dt, cursor_id = decode_cursor(cursor) if cursor else (None, None)
+
+        rows = self.tx_repo.list_rows(
             user_id=user.id,
             from_ts=from_ts,
             to_ts=to_ts,
             type_int=type_int,
             category_id=category_id,
             payment_method_int=pm_int,
-            q_text=(q_text or "").strip() if q_text else None,
+            q_text=q_text,
             limit=limit,
             cursor_occurred_at=cursor_dt,
             cursor_id=cursor_id,
+            sort="relevance" if by_relevance else "date",
+            cursor_rank=cursor_rank,
         )
 
         next_cursor = None
-        if len(items) == limit:
-            last = items[-1]
-            next_cursor = encode_cursor(last.occurred_at, last.id)
+        if len(rows) == limit:
+            last = rows[-1]
+            if by_relevance:
+                next_cursor = encode_rank_cursor(last[-1], last[4], last[0])
+            else:
+                next_cursor = encode_cursor(last[4], last[0])
 
-        return items, next_cursor
+        return [_list_item(row) for row in rows], next_cursor
 
     def get_by_id(self, user, tx_id: UUID) -> Transaction:
         tx = self.tx_repo.get_by_id(user.id, tx_id)
@@ -274,3 +679,36 @@ class TransactionsService:
         return tx
 
 
+
+
+def _require_narrowed(clauses: list) -> None:
+    # filter_clauses always starts with the user_id predicate; nothing else means
+    # "every row the user owns", which a bulk delete must never run as
+    if len(clauses) <= 1:
+        raise AppError("VALIDATION_ERROR", "At least one filter is required", status_code=400)
+
+
+def run_bulk_delete(job_id: UUID, clauses: list) -> None:
+    # sync on purpose: BackgroundTasks runs it in the threadpool. Each chunk and its
+    # progress update commit together; a crash leaves the job consistent with the table.
+    chunk = settings.transactions_delete_chunk_rows
+    deleted = 0
+    try:
+        _require_narrowed(clauses)
+        with SessionLocal() as db:
+            JobsRepo(db).update_fields(job_id, {"status": "running"})
+            db.commit()
+            while True:
+                n = TransactionsRepo(db).delete_chunk(clauses, chunk)
+                deleted += n
+                JobsRepo(db).update_fields(job_id, {"processed": deleted, "succeeded": deleted})
+                db.commit()
+                if n < chunk:
+                    break
+            JobsRepo(db).update_fields(job_id, {"status": "done", "finished_at": datetime.utcnow()})
+            db.commit()
+    except Exception as e:
+        logger.exception("Bulk delete job %s failed", job_id)
+        with SessionLocal() as db:
+            JobsRepo(db).update_fields(job_id, {"status": "failed", "message": str(e)[:1000], "finished_at": datetime.utcnow()})
+            db.commit()
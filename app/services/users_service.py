@@ -1,9 +1,97 @@
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass, replace
 from datetime import datetime
+from uuid import UUID
+
+from cachetools import TTLCache
 from sqlalchemy.orm import Session
+
 from app.models.user import User
 from app.repositories.users_repo import UsersRepo
 from app.services.categories_service import CategoriesService
 from app.core.config import settings
+from app.core.db import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """
+    Detached, read-only view of a user row; safe to cache and share between requests.
+    """
+    id: UUID
+    external_auth_id: str
+    email: str
+    full_name: str | None
+    timezone: str
+    currency: str
+    base_currency: str
+    display_currency: str
+    created_at: datetime
+    updated_at: datetime
+
+    @classmethod
+    def from_model(cls, user: User) -> "CurrentUser":
+        return cls(
+            id=user.id,
+            external_auth_id=user.external_auth_id,
+            email=user.email,
+            full_name=user.full_name,
+            timezone=user.timezone,
+            currency=user.currency,
+            base_currency=user.base_currency,
+            display_currency=user.display_currency,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+        )
+
+    def claims_differ(self, email: str, full_name: str | None) -> bool:
+        # same rule as the write path: empty claims never overwrite stored values
+        return bool(email and self.email != email) or bool(full_name and self.full_name != full_name)
+
+
+class IdentityCache:
+    """
+    external_auth_id -> CurrentUser. TTL bounds how long a change made by another
+    worker (or directly in the DB) can go unnoticed here.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: int) -> None:
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl_seconds)
+        self._lock = threading.Lock()  # get_current_user runs in the threadpool
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, external_auth_id: str) -> CurrentUser | None:
+        with self._lock:
+            user = self._cache.get(external_auth_id)
+            if user is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return user
+
+    def put(self, user: CurrentUser) -> None:
+        with self._lock:
+            self._cache[user.external_auth_id] = user
+
+    def invalidate(self, external_auth_id: str) -> None:
+        with self._lock:
+            self._cache.pop(external_auth_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._cache)}
+
+
+identity_cache = IdentityCache(
+    maxsize=settings.user_identity_cache_size,
+    ttl_seconds=settings.user_identity_cache_ttl_seconds,
+)
 
 
 class UsersService:
@@ -11,36 +99,84 @@ class UsersService:
         self.db = db
         self.repo = UsersRepo(db)
 
-    def get_or_create_by_external_auth(self, external_auth_id: str, email: str, full_name: str | None):
+    def resolve_identity(self, external_auth_id: str, email: str, full_name: str | None) -> tuple[CurrentUser, bool]:
+        """
+        Returns (user snapshot, claims_changed).
+        Only a first-seen user is written on the request path; when claims_changed is
+        True the caller should run sync_user_claims off the request path.
+        """
+        cached = identity_cache.get(external_auth_id)
+        if cached is not None:
+            if not cached.claims_differ(email, full_name):
+                return cached, False
+            return self._with_claims(cached, email, full_name), True
+
         user = self.repo.get_by_external_auth_id(external_auth_id)
-        created = False
-        if not user:
-            user = User(
-                external_auth_id=external_auth_id,
-                email=email or "",
-                full_name=full_name,
-                timezone=settings.default_timezone,
-                currency=settings.default_currency,
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow(),
-            )
-            self.repo.create(user)
-            created = True
-        else:
-            # optional: keep email/name up-to-date (safe for MVP)
-            changed = False
-            if email and user.email != email:
-                user.email = email
-                changed = True
-            if full_name and user.full_name != full_name:
-                user.full_name = full_name
-                changed = True
-            if changed:
-                user.updated_at = datetime.utcnow()
-
-        if created:
-            CategoriesService(self.db).seed_default_categories(user.id)
+        if user is None:
+            snapshot = CurrentUser.from_model(self._create(external_auth_id, email, full_name))
+            identity_cache.put(snapshot)
+            return snapshot, False
 
+        snapshot = CurrentUser.from_model(user)
+        if snapshot.claims_differ(email, full_name):
+            return self._with_claims(snapshot, email, full_name), True
+        identity_cache.put(snapshot)
+        return snapshot, False
+
+    @staticmethod
+    def _with_claims(user: CurrentUser, email: str, full_name: str | None) -> CurrentUser:
+        updated = replace(user, email=email or user.email, full_name=full_name or user.full_name)
+        identity_cache.put(updated)
+        return updated
+
+    def _create(self, external_auth_id: str, email: str, full_name: str | None) -> User:
+        user = User(
+            external_auth_id=external_auth_id,
+            email=email or "",
+            full_name=full_name,
+            timezone=settings.default_timezone,
+            currency=settings.default_currency,
+            created_at=datetime.utcnow(),
+            updated_at=datetime.utcnow(),
+        )
+        self.repo.create(user)
+        CategoriesService(self.db).seed_default_categories(user.id)
         self.db.commit()
         self.db.refresh(user)
         return user
+
+    def get_or_create_by_external_auth(self, external_auth_id: str, email: str, full_name: str | None):
+        user = self.repo.get_by_external_auth_id(external_auth_id)
+        if not user:
+            return self._create(external_auth_id, email, full_name)
+
+        # optional: keep email/name up-to-date (safe for MVP)
+        changed = False
+        if email and user.email != email:
+            user.email = email
+            changed = True
+        if full_name and user.full_name != full_name:
+            user.full_name = full_name
+            changed = True
+
+        if changed:
+            user.updated_at = datetime.utcnow()
+            self.db.commit()
+            self.db.refresh(user)
+            identity_cache.invalidate(external_auth_id)
+        return user
+
+
+def sync_user_claims(external_auth_id: str, email: str, full_name: str | None) -> None:
+    """
+    Background task: persists changed email/name claims and refreshes the cached snapshot.
+    """
+    db = SessionLocal()
+    try:
+        user = UsersService(db).get_or_create_by_external_auth(external_auth_id, email, full_name)
+        identity_cache.put(CurrentUser.from_model(user))
+    except Exception:
+        logger.exception("Failed to sync user claims for %s", external_auth_id)
+        identity_cache.invalidate(external_auth_id)
+    finally:
+        db.close()
@@ -0,0 +1,37 @@
+"""add fx_rates table
+
+Revision ID: c3e8b7f41a26
+Revises: a611ac26c2fe
+Create Date: 2026-10-16 10:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e8b7f41a26'
+down_revision: Union[str, None] = 'a611ac26c2fe'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # shared NBU day tables: one row per (requested date, currency)
+    op.create_table(
+        "fx_rates",
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("currency", sa.String(length=8), nullable=False),
+        sa.Column("uah_per_unit", sa.Numeric(18, 8), nullable=False),
+        sa.Column("resolved_date", sa.Date(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.PrimaryKeyConstraint("date", "currency"),
+    )
+    op.create_index("ix_fx_rates_resolved_date", "fx_rates", ["resolved_date"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_fx_rates_resolved_date", table_name="fx_rates")
+    op.drop_table("fx_rates")
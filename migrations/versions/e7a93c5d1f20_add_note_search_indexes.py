@@ -0,0 +1,55 @@
+"""add note search indexes
+
+Revision ID: e7a93c5d1f20
+Revises: d41f2c9a7b53
+Create Date: 2026-10-17 13:05:27.640311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a93c5d1f20'
+down_revision: Union[str, None] = 'd41f2c9a7b53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # substring search (ILIKE '%q%') via trigrams; word search via a generated tsvector.
+    # 'simple' config: notes mix languages, so no stemming
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # NOTE: adding a STORED generated column rewrites `transactions` under an ACCESS EXCLUSIVE
+    # lock (reads and writes wait for the whole rewrite); on a large table run this in a
+    # maintenance window
+    op.add_column(
+        "transactions",
+        sa.Column(
+            "note_tsv",
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('simple', coalesce(note, ''))", persisted=True),
+            nullable=True,
+        ),
+    )
+    # the indexes are built CONCURRENTLY (no write lock), which cannot run inside a transaction.
+    # If a build fails it leaves an INVALID index: drop it and run the upgrade again
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_tx_note_trgm", "transactions", ["note"],
+            postgresql_using="gin", postgresql_ops={"note": "gin_trgm_ops"}, postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_tx_note_tsv", "transactions", ["note_tsv"],
+            postgresql_using="gin", postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_tx_note_tsv", table_name="transactions", postgresql_concurrently=True)
+        op.drop_index("ix_tx_note_trgm", table_name="transactions", postgresql_concurrently=True)
+    op.drop_column("transactions", "note_tsv")
@@ -0,0 +1,30 @@
+"""add updated_at to fx_rates
+
+Revision ID: f3b8c2d47a19
+Revises: e7a93c5d1f20
+Create Date: 2026-10-17 16:42:08.512734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b8c2d47a19'
+down_revision: Union[str, None] = 'e7a93c5d1f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # bumped by the upsert when a stored rate changes; the shared-table change detector reads it
+    op.add_column(
+        "fx_rates",
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("fx_rates", "updated_at")
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the GET /transactions page build: the column-projection path
+(TransactionsService.list -> dicts -> JSONResponse) against the ORM path it replaced
+(list_cursor -> Transaction instances -> TransactionDto -> response_model validation).
+Both are measured from the query to the JSON bytes, on the same page of the user's data;
+the outputs are checked to be identical first.
+
+Against DATABASE_URL, as an existing user with data in the month:
+  python scripts/bench_tx_list.py --user-email me@example.com --month 2025-03 --limit 100
+
+Self-contained, on an in-memory SQLite database seeded with N rows in --month (no note
+search indexes there; they are not used by this page):
+  python scripts/bench_tx_list.py --sqlite-rows 3000 --month 2025-03 --limit 100 --rounds 50
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from decimal import Decimal
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")  # only used by --sqlite-rows then
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.pool import StaticPool
+
+from app.core.db import Base, SessionLocal
+from app.core.money import cents_to_amount_str
+from app.core.time import month_range_kyiv
+from app.models.category import Category
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.repositories.transactions_repo import TransactionsRepo
+from app.schemas.transaction import TransactionCategoryDto, TransactionDto, TransactionsResponse
+from app.services.category_resolver import CategoryResolver
+from app.services.transactions_service import TransactionsService, pm_to_str
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Benchmark the transactions list page build.")
+    p.add_argument("--user-email", default="", help="Run as this user (default: first user).")
+    p.add_argument("--month", required=True, help="YYYY-MM with data for the user.")
+    p.add_argument("--limit", type=int, default=100, help="Page size.")
+    p.add_argument("--rounds", type=int, default=200)
+    p.add_argument("--sqlite-rows", type=int, default=0, help="Seed an in-memory SQLite database with N rows instead of using DATABASE_URL.")
+    return p.parse_args()
+
+
+@compiles(TSVECTOR, "sqlite")
+def _tsvector_sqlite(type_, compiler, **kw):
+    return "TEXT"
+
+
+def use_sqlite(rows: int, month: str) -> None:
+    # the Postgres-only note search column/indexes have no SQLite equivalent; the list page
+    # does not read them
+    table = Transaction.__table__
+    for ix in [ix for ix in table.indexes if ix.name.startswith("ix_tx_note")]:
+        table.indexes.discard(ix)
+    table.c.note_tsv.computed = None
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    SessionLocal.configure(bind=engine)
+    Base.metadata.create_all(engine)
+
+    y, m = (int(x) for x in month.split("-"))
+    with SessionLocal() as db:
+        user = User(external_auth_id="bench", email="bench@example.com", base_currency="CZK")
+        db.add(user)
+        db.flush()
+        cats = [Category(user_id=user.id, type=0, name=f"Category {i}", icon="*") for i in range(8)]
+        db.add_all(cats)
+        db.flush()
+        for i in range(rows):
+            db.add(Transaction(
+                user_id=user.id,
+                type=0,
+                amount_cents=100 + i,
+                currency="CZK",
+                occurred_at=datetime(y, m, 1 + i % 28, 12, i % 60, tzinfo=timezone.utc),
+                category_id=cats[i % len(cats)].id,
+                payment_method=1,
+                note=f"note {i}" if i % 3 else None,
+                original_amount_cents=100 + i,
+                original_currency="CZK" if i % 2 else "EUR",
+                fx_rate_to_base=Decimal(1),
+                fx_date=datetime(y, m, 1 + i % 28).date(),
+            ))
+        db.commit()
+
+
+def _dumps(content) -> bytes:
+    # what fastapi's JSONResponse does
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def orm_page(db, user, from_ts, to_ts, limit: int) -> bytes:
+    db.expunge_all()  # a fresh session per request in the app
+    items = TransactionsRepo(db).list_cursor(user.id, from_ts, to_ts, None, None, None, None, limit, None, None)
+    categories = CategoryResolver(db, user.id)
+    categories.load(tx.category_id for tx in items)
+    dtos = []
+    for tx in items:
+        cat = categories.get(tx.category_id)
+        dtos.append(
+            TransactionDto(
+                id=str(tx.id),
+                type="income" if tx.type == 1 else "expense",
+                amount=cents_to_amount_str(tx.amount_cents),
+                currency=tx.currency,
+                occurredAt=tx.occurred_at.isoformat(),
+                category=TransactionCategoryDto(
+                    id=str(tx.category_id),
+                    name=cat.name if cat else "Unknown",
+                    icon=cat.icon if cat else None,
+                ),
+                paymentMethod=pm_to_str(tx.payment_method),
+                note=tx.note,
+                createdAt=tx.created_at.isoformat(),
+                updatedAt=tx.updated_at.isoformat(),
+                originalAmount=cents_to_amount_str(tx.original_amount_cents),
+                originalCurrency=tx.original_currency,
+                fxRateToBase=float(tx.fx_rate_to_base) if tx.fx_rate_to_base is not None else 1.0,
+                fxDate=tx.fx_date.isoformat() if tx.fx_date is not None else tx.occurred_at.date().isoformat(),
+            )
+        )
+    # response_model: validate the returned value again, then serialize
+    validated = TransactionsResponse.model_validate({"items": dtos, "nextCursor": None})
+    return _dumps(validated.model_dump(mode="json"))
+
+
+def projection_page(db, user, from_ts, to_ts, limit: int) -> bytes:
+    db.expunge_all()
+    items, _ = TransactionsService(db).list(user, from_ts, to_ts, None, None, None, None, limit, None)
+    return _dumps({"items": items, "nextCursor": None})
+
+
+def measure(fn, rounds: int, *args) -> dict:
+    fn(*args)  # warm-up
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        body = fn(*args)
+    elapsed = time.perf_counter() - t0
+
+    # memory allocated while building one page (peak over the call)
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    rows = len(json.loads(body)["items"])
+    return {
+        "rows": rows,
+        "ms_per_page": elapsed / rounds * 1000,
+        "rows_per_s": rows * rounds / elapsed if elapsed else 0.0,
+        "peak_kib": peak / 1024,
+    }
+
+
+def main() -> int:
+    args = parse_args()
+    if args.sqlite_rows:
+        use_sqlite(args.sqlite_rows, args.month)
+    from_ts, to_ts = month_range_kyiv(args.month)
+    with SessionLocal() as db:
+        q = select(User)
+        if args.user_email:
+            q = q.where(User.email == args.user_email)
+        user = db.execute(q.limit(1)).scalar_one_or_none()
+        if user is None:
+            print("No such user", file=sys.stderr)
+            return 2
+        db.expunge(user)
+
+        a = json.loads(orm_page(db, user, from_ts, to_ts, args.limit))
+        b = json.loads(projection_page(db, user, from_ts, to_ts, args.limit))
+        if a != b:
+            print("Outputs differ", file=sys.stderr)
+            return 1
+
+        print(f"page of {len(a['items'])} rows, {args.rounds} rounds")
+        for name, fn in (("orm+pydantic", orm_page), ("projection", projection_page)):
+            r = measure(fn, args.rounds, db, user, from_ts, to_ts, args.limit)
+            print(f"  {name:<13} {r['ms_per_page']:7.2f} ms/page {r['rows_per_s']:10.0f} rows/s "
+                  f"peak alloc {r['peak_kib']:7.1f} KiB/page")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Checks that note search (GET /transactions?q=...) is served by the note indexes
+(ix_tx_note_trgm / ix_tx_note_tsv) and not by a scan of the user's rows.
+Runs EXPLAIN on the exact query the list endpoint builds; exits 1 if neither index
+shows up in the plan.
+
+Small tables make the planner prefer a seq scan, so by default seq scans are disabled
+for the check (this proves the index is usable for the query); pass --no-force to see
+what the planner picks on real data.
+
+tests/test_note_search_plan.py runs the same check in the test suite against a Postgres
+DATABASE_URL; this script is for looking at plans on real data.
+
+Example:
+  python scripts/explain_note_search.py --user-email me@example.com --q coffee
+"""
+import argparse
+import json
+import os
+import sys
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app.models.user import User
+from app.repositories.transactions_repo import TransactionsRepo
+
+NOTE_INDEXES = ("ix_tx_note_trgm", "ix_tx_note_tsv")
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="EXPLAIN the note search query and check index use.")
+    p.add_argument("--db-url", default=os.getenv("DATABASE_URL") or "", help="Postgres SQLAlchemy URL (default: DATABASE_URL).")
+    p.add_argument("--user-email", default="", help="Run the search as this user (default: first user).")
+    p.add_argument("--q", default="coffee", help="Search text.")
+    p.add_argument("--sort", choices=("date", "relevance"), default="date")
+    p.add_argument("--no-force", action="store_true", help="Leave enable_seqscan on.")
+    p.add_argument("--analyze", action="store_true", help="EXPLAIN ANALYZE (executes the query).")
+    return p.parse_args()
+
+
+def plan_nodes(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def main() -> int:
+    args = parse_args()
+    if not args.db_url:
+        print("DATABASE_URL is not set", file=sys.stderr)
+        return 2
+
+    engine = create_engine(args.db_url)
+    session = sessionmaker(bind=engine)()
+    try:
+        q = select(User)
+        if args.user_email:
+            q = q.where(User.email == args.user_email)
+        user = session.execute(q.limit(1)).scalar_one_or_none()
+        if user is None:
+            print("No such user", file=sys.stderr)
+            return 2
+
+        stmt = TransactionsRepo(session).list_query(
+            user.id, None, None, None, None, None, args.q, 30, None, None, sort=args.sort,
+        )
+        compiled = stmt.compile(dialect=engine.dialect)
+
+        conn = session.connection()
+        if not args.no_force:
+            conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        options = "ANALYZE, FORMAT JSON" if args.analyze else "FORMAT JSON"
+        raw = conn.exec_driver_sql(f"EXPLAIN ({options}) {compiled}", compiled.params).scalar()
+        plan = (raw if isinstance(raw, list) else json.loads(raw))[0]["Plan"]
+        session.rollback()
+    finally:
+        session.close()
+
+    used = sorted({n["Index Name"] for n in plan_nodes(plan) if n.get("Index Name") in NOTE_INDEXES})
+    for n in plan_nodes(plan):
+        print(f'{n["Node Type"]:<24} {n.get("Index Name", n.get("Relation Name", ""))}')
+    if not used:
+        print("FAIL: note search does not use the note indexes")
+        return 1
+    print(f"OK: uses {', '.join(used)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Prefetch NBU FX day tables for a date range (e.g. before a big import or right after a deploy).
+
+Example:
+  python scripts/prefetch_fx.py --from 2023-01-01 --to 2024-12-31 --concurrency 6
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from datetime import date
+
+# Make "app" importable when running from backend/
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app.services.fx_service import fx_service_singleton
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Warm the FX cache (fx_rates table) for a date range.")
+    p.add_argument("--from", dest="from_date", required=True, help="First date, YYYY-MM-DD.")
+    p.add_argument("--to", dest="to_date", default=date.today().isoformat(), help="Last date, YYYY-MM-DD (default: today).")
+    p.add_argument("--concurrency", type=int, default=4, help="Max concurrent NBU requests.")
+    return p.parse_args()
+
+
+async def run(start: date, end: date, concurrency: int) -> dict:
+    await fx_service_singleton.startup()
+    try:
+        return await fx_service_singleton.prefetch_range(start, end, concurrency=concurrency)
+    finally:
+        await fx_service_singleton.shutdown()
+
+
+def main():
+    args = parse_args()
+    start = date.fromisoformat(args.from_date)
+    end = date.fromisoformat(args.to_date)
+    if end < start:
+        raise SystemExit("--to must be >= --from")
+
+    report = asyncio.run(run(start, end, args.concurrency))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import os
+
+# app settings need a DATABASE_URL at import time; tests that talk to Postgres check
+# for a real one and skip otherwise
+os.environ.setdefault("DATABASE_URL", "sqlite://")
@@ -0,0 +1,102 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi import BackgroundTasks
+from fastapi.testclient import TestClient
+
+from app.core.db import get_db
+from app.core.errors import AppError
+from app.core.security import get_current_user
+from app.main import app
+from app.models.transaction import Transaction
+from app.repositories.transactions_repo import TransactionsRepo
+from app.schemas.transaction import TransactionBulkFilter
+from app.services import transactions_service
+from app.services.fx_service import fx_service_singleton
+from app.services.transactions_service import TransactionsService
+
+USER = SimpleNamespace(id=uuid.uuid4(), base_currency="UAH")
+
+
+@pytest.fixture
+def deletes(monkeypatch):
+    calls = []
+
+    def record(name):
+        def fn(self, *args, **kwargs):
+            calls.append(name)
+            return 0
+        return fn
+
+    monkeypatch.setattr(TransactionsRepo, "count", record("count"))
+    monkeypatch.setattr(TransactionsRepo, "delete_chunk", record("delete_chunk"))
+    return calls
+
+
+@pytest.fixture
+def client():
+    app.dependency_overrides[get_current_user] = lambda: USER
+    app.dependency_overrides[get_db] = lambda: SimpleNamespace()
+    yield TestClient(app)  # no lifespan: nothing here needs JWKS or FX
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.parametrize("q", ["", " ", "   \t\n"])
+def test_delete_with_blank_q_is_rejected(client, deletes, q):
+    r = client.request("DELETE", "/transactions", json={"q": q})
+    assert r.status_code == 400
+    assert r.json()["error"]["code"] == "VALIDATION_ERROR"
+    assert deletes == []
+
+
+@pytest.mark.parametrize("q", ["", "   "])
+def test_bulk_update_with_blank_q_is_rejected(client, q):
+    r = client.patch("/transactions/bulk", json={"filter": {"q": q}, "set": {"paymentMethod": "cash"}})
+    assert r.status_code == 400
+
+
+def test_delete_refuses_user_only_clauses(monkeypatch, deletes):
+    svc = TransactionsService(SimpleNamespace())
+    monkeypatch.setattr(svc, "_bulk_clauses", lambda user, f: [Transaction.user_id == user.id])
+    with pytest.raises(AppError) as e:
+        svc.bulk_delete(user=USER, filters=TransactionBulkFilter(q="x"), background_tasks=BackgroundTasks())
+    assert e.value.status_code == 400
+    assert deletes == []
+
+
+def test_delete_job_refuses_user_only_clauses(monkeypatch, deletes):
+    failed = []
+    monkeypatch.setattr(transactions_service, "JobsRepo", lambda db: SimpleNamespace(
+        update_fields=lambda job_id, fields: failed.append(fields.get("status")),
+    ))
+    monkeypatch.setattr(transactions_service, "SessionLocal", lambda: _NullSession())
+    transactions_service.run_bulk_delete(uuid.uuid4(), [Transaction.user_id == USER.id])
+    assert failed == ["failed"]
+    assert deletes == []
+
+
+class _NullSession:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def commit(self):
+        pass
+
+
+def test_bulk_update_rejects_unknown_currency_before_touching_rows(client, monkeypatch):
+    touched = []
+    monkeypatch.setattr(TransactionsRepo, "fx_source_rows", lambda self, *a: touched.append(a) or [])
+    monkeypatch.setattr(TransactionsRepo, "update_by_ids", lambda self, values: touched.append(values))
+
+    async def supports_currency(code, as_of):
+        return code != "XYZ"
+
+    monkeypatch.setattr(fx_service_singleton, "supports_currency", supports_currency)
+    r = client.patch("/transactions/bulk", json={"filter": {"type": "expense"}, "set": {"currency": "xyz"}})
+    assert r.status_code == 400
+    assert r.json()["error"]["code"] == "VALIDATION_ERROR"
+    assert touched == []
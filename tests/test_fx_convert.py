@@ -0,0 +1,80 @@
+import random
+from decimal import Decimal, ROUND_HALF_UP
+
+import pytest
+
+from app.core.fx import (
+    RATE_SCALE,
+    convert_cents,
+    convert_cents_batch,
+    convert_original_to_base_cents,
+    rate_to_scaled,
+    scaled_to_rate,
+)
+
+CENT = Decimal("0.01")
+RATE_QUANT = Decimal("1e-8")
+
+# exact half-cent ties in both directions
+TIES = [(c, r) for c in (1, 3, 5, -1, -3, 125, -125) for r in (RATE_SCALE // 2, RATE_SCALE + RATE_SCALE // 2)]
+
+
+def reference(cents: int, rate_scaled: int) -> int:
+    # the old per-row Decimal path: amount x rate, quantized half-up to cents
+    amount = Decimal(cents) / 100
+    return int((amount * scaled_to_rate(rate_scaled)).quantize(CENT, rounding=ROUND_HALF_UP) * 100)
+
+
+def random_cases(n: int, seed: int = 42) -> list[tuple[int, int]]:
+    rng = random.Random(seed)
+    cases = []
+    for _ in range(n):
+        cents = rng.choice([rng.randint(-10**4, 10**4), rng.randint(-10**12, 10**12)])
+        # NBU cross rates range from ~1e-5 (e.g. IDR->USD) to ~1e5 (XAU->UAH)
+        rate = max(1, int(10 ** rng.uniform(-5, 5) * RATE_SCALE))
+        cases.append((cents, rate))
+    return cases
+
+
+@pytest.mark.parametrize("rate", [0.1, 1 / 3, 2 / 3, 22.77777777777778, 0.000000005, 41.123456785])
+def test_rate_to_scaled_matches_numeric_rounding(rate):
+    expected = int(Decimal(str(rate)).quantize(RATE_QUANT, rounding=ROUND_HALF_UP) * RATE_SCALE)
+    assert rate_to_scaled(rate) == expected
+
+
+@pytest.mark.parametrize("cents,rate_scaled", TIES)
+def test_convert_cents_rounds_ties_away_from_zero(cents, rate_scaled):
+    assert convert_cents(cents, rate_scaled) == reference(cents, rate_scaled)
+
+
+def test_convert_cents_matches_decimal_reference():
+    for cents, r in random_cases(50_000):
+        assert convert_cents(cents, r) == reference(cents, r), (cents, r)
+
+
+def test_convert_cents_batch_matches_decimal_reference():
+    cases = random_cases(20_000, seed=7) + TIES
+    cents = [c for c, _ in cases]
+    rates = [r for _, r in cases]
+    assert convert_cents_batch(cents, rates) == [reference(c, r) for c, r in cases]
+    for one_rate in (rates[0], RATE_SCALE // 2, RATE_SCALE + RATE_SCALE // 2):
+        assert convert_cents_batch(cents, one_rate) == [reference(c, one_rate) for c in cents]
+
+
+def test_convert_cents_batch_rejects_mismatched_lengths():
+    with pytest.raises(ValueError):
+        convert_cents_batch([1, 2], [RATE_SCALE])
+
+
+def test_convert_original_to_base_cents_matches_decimal_reference():
+    rng = random.Random(3)
+    for _ in range(20_000):
+        amount = f"{rng.randint(0, 10**7)}.{rng.randint(0, 999):03d}"  # rounded to cents first
+        rate = 10 ** rng.uniform(-5, 5)
+        stored_amount = Decimal(amount).quantize(CENT, rounding=ROUND_HALF_UP)
+        stored_rate = Decimal(str(rate)).quantize(RATE_QUANT, rounding=ROUND_HALF_UP)
+        expected = int((stored_amount * stored_rate).quantize(CENT, rounding=ROUND_HALF_UP) * 100)
+        assert convert_original_to_base_cents(amount, rate) == expected, (amount, rate)
+    # half-cent tie after conversion, and a comma decimal separator
+    assert convert_original_to_base_cents("0.01", 0.5) == 1
+    assert convert_original_to_base_cents("0,03", 1.5) == 5
@@ -0,0 +1,83 @@
+import asyncio
+from datetime import date
+
+import pytest
+
+from app.services.fx_providers import FxUpstreamError
+from app.services.fx_service import FxService
+
+AS_OF = date(2025, 3, 5)  # a past business day: the requested date has its own table
+CALLERS = 300
+
+
+class StandInNbu:
+    """Local NBU stand-in: counts fetches and answers after a short delay."""
+
+    name = "stand-in"
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.fail = False
+
+    async def fetch_day(self, d: date) -> dict:
+        self.calls += 1
+        await asyncio.sleep(0.05)  # keep every caller waiting on the same fetch
+        if self.fail:
+            raise RuntimeError("NBU is down")
+        return {"UAH": 1.0, "USD": 41.25, "EUR": 44.5}
+
+
+def make_service(provider: StandInNbu) -> FxService:
+    # no session factory: memory-only, so a failure has no stale table to fall back to
+    return FxService(
+        providers=[provider],
+        hedge_min_delay_seconds=5.0,  # no hedged second request within the test
+        hedge_default_delay_seconds=5.0,
+        upstream_budget_seconds=10.0,
+        breaker_failure_threshold=100,
+    )
+
+
+def test_concurrent_get_rate_makes_one_upstream_request():
+    nbu = StandInNbu()
+    svc = make_service(nbu)
+
+    async def run():
+        return await asyncio.gather(*(svc.get_rate("USD", "EUR", AS_OF) for _ in range(CALLERS)))
+
+    rates = asyncio.run(run())
+    assert nbu.calls == 1
+    assert len(rates) == CALLERS
+    assert {r.rate for r in rates} == {41.25 / 44.5}
+    assert all(r.as_of == AS_OF for r in rates)
+
+
+def test_failed_fetch_reaches_every_waiter():
+    nbu = StandInNbu()
+    nbu.fail = True
+    svc = make_service(nbu)
+
+    async def run():
+        return await asyncio.gather(
+            *(svc.get_rate("USD", "EUR", AS_OF) for _ in range(CALLERS)), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert len(results) == CALLERS
+    assert all(isinstance(r, FxUpstreamError) for r in results)
+
+
+def test_call_after_failure_fetches_again():
+    nbu = StandInNbu()
+    nbu.fail = True
+    svc = make_service(nbu)
+    with pytest.raises(FxUpstreamError):
+        asyncio.run(svc.get_rate("USD", "EUR", AS_OF))
+    failed_calls = nbu.calls
+
+    # the failure is not cached: the next call goes upstream again and succeeds
+    nbu.fail = False
+    rate = asyncio.run(svc.get_rate("USD", "EUR", AS_OF))
+    assert nbu.calls == failed_calls + 1
+    assert rate.rate == pytest.approx(41.25 / 44.5)
+    assert not rate.stale
@@ -0,0 +1,121 @@
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete
+
+from app.core.config import settings
+from app.core.db import SessionLocal, engine
+from app.core.query_counter import count_queries
+from app.core.security import get_current_user
+from app.main import app
+from app.models.budget import Budget
+from app.models.category import Category
+from app.models.transaction import Transaction
+from app.models.user import User
+
+pytestmark = pytest.mark.skipif(
+    not settings.database_url.startswith("postgresql"),
+    reason="needs a migrated Postgres database in DATABASE_URL",
+)
+
+MONTH = "2025-03"
+
+# endpoint -> max statements per request, however many rows the user has
+BUDGETS = {
+    "transactions": 1,  # page with categories joined
+    "transaction": 2,  # row + its category
+    "dashboard": 6,  # 4 aggregates + recent + categories
+    "stats": 5,  # 4 aggregates + categories
+    "budgets": 4,  # budgets + 2 aggregates + categories
+}
+
+
+@pytest.fixture(scope="module")
+def seeded_user():
+    # base == display currency, so no endpoint needs an FX rate
+    with SessionLocal() as db:
+        user = User(
+            external_auth_id=f"test-query-counts-{uuid.uuid4()}",
+            email="query-counts@example.com",
+            base_currency="UAH",
+            display_currency="UAH",
+        )
+        db.add(user)
+        db.flush()
+        cats = [Category(user_id=user.id, type=0, name=f"Category {i}") for i in range(8)]
+        db.add_all(cats)
+        db.flush()
+        for i in range(120):
+            db.add(Transaction(
+                user_id=user.id,
+                type=0,
+                amount_cents=100 + i,
+                currency="UAH",
+                occurred_at=datetime(2025, 3, 1 + i % 28, 12, tzinfo=timezone.utc),
+                category_id=cats[i % len(cats)].id,
+                payment_method=1,
+                note=f"note {i}",
+                original_amount_cents=100 + i,
+                original_currency="UAH",
+                fx_rate_to_base=Decimal(1),
+                fx_date=date(2025, 3, 1 + i % 28),
+            ))
+        for c in cats[:4]:
+            db.add(Budget(
+                user_id=user.id,
+                category_id=c.id,
+                month=MONTH,
+                limit_cents=10_000,
+                base_currency="UAH",
+                original_limit_cents=10_000,
+                original_currency="UAH",
+                fx_rate_to_base=Decimal(1),
+                fx_date=date(2025, 3, 1),
+            ))
+        db.commit()
+        db.refresh(user)
+        db.expunge(user)
+
+    yield user
+
+    with SessionLocal() as db:
+        db.execute(delete(Transaction).where(Transaction.user_id == user.id))
+        db.execute(delete(Budget).where(Budget.user_id == user.id))
+        db.execute(delete(Category).where(Category.user_id == user.id))
+        db.execute(delete(User).where(User.id == user.id))
+        db.commit()
+
+
+@pytest.fixture
+def client(seeded_user):
+    app.dependency_overrides[get_current_user] = lambda: seeded_user
+    yield TestClient(app)  # no lifespan: nothing here needs JWKS or FX
+    app.dependency_overrides.clear()
+
+
+def any_tx_id(user_id) -> str:
+    with SessionLocal() as db:
+        return str(db.query(Transaction.id).filter(Transaction.user_id == user_id).limit(1).scalar())
+
+
+@pytest.mark.parametrize(
+    "name,url",
+    [
+        ("transactions", f"/transactions?month={MONTH}&limit=1"),
+        ("transactions", f"/transactions?month={MONTH}&limit=100"),
+        ("dashboard", f"/dashboard/summary?month={MONTH}"),
+        ("stats", f"/stats/summary?from={MONTH}-01&to={MONTH}-31"),
+        ("budgets", f"/budgets?month={MONTH}"),
+        ("transaction", None),
+    ],
+)
+def test_read_endpoints_run_a_constant_number_of_statements(client, seeded_user, name, url):
+    if url is None:
+        url = f"/transactions/{any_tx_id(seeded_user.id)}"
+    with count_queries(engine) as qc:
+        r = client.get(url)
+    assert r.status_code == 200, r.text
+    assert qc.count <= BUDGETS[name], qc.statements
@@ -0,0 +1,29 @@
+import uuid
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from app.core.db import get_db
+from app.core.security import get_current_user
+from app.main import app
+from app.repositories.categories_repo import CategoriesRepo
+from app.repositories.transactions_repo import TransactionsRepo
+
+USER = SimpleNamespace(id=uuid.uuid4(), base_currency="UAH")
+
+
+def test_non_object_items_fail_one_by_one(monkeypatch):
+    monkeypatch.setattr(TransactionsRepo, "ids_by_client_refs", lambda self, user_id, refs: {})
+    monkeypatch.setattr(CategoriesRepo, "map_by_ids", lambda self, user_id, ids: {})
+    app.dependency_overrides[get_current_user] = lambda: USER
+    app.dependency_overrides[get_db] = lambda: SimpleNamespace(commit=lambda: None)
+    try:
+        r = TestClient(app).post("/transactions/batch", json={"items": [5, "x", None, [], {"type": "expense"}]})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert r.status_code == 200
+    body = r.json()
+    assert body["failed"] == 5
+    assert [x["index"] for x in body["items"]] == [0, 1, 2, 3, 4]
+    assert all(x["error"]["code"] == "VALIDATION_ERROR" for x in body["items"])